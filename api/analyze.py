@@ -1,14 +1,138 @@
+import hashlib
 import json
 import os
-import tempfile
-import fitz  # PyMuPDF
-import google.generativeai as genai
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import re
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import parse_qs
 import cgi
 import io
 
+# orjson for response bodies, stdlib json as fallback
+try:
+    import orjson
+    _dumps = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+
+@lru_cache(maxsize=1)
+def _gemini_model(api_key):
+    """Shared gemini-1.5-flash model, configured once per API key"""
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-1.5-flash')
+
+# Contract structure patterns, compiled once. Header and title lines are
+# each recognized by one alternation instead of trying several patterns.
+_NUMBERED_SECTION_RE = re.compile(r'\b\d+\.\s*[A-Z]')
+_RECITALS_RE = re.compile(r'\bWHEREAS\b.*\bNOW THEREFORE\b', re.IGNORECASE | re.DOTALL)
+_CLAUSE_HEADER_RE = re.compile(r'\d+\.?\s*[A-Z]|(?i:(?:Article|Section|Clause)\s+[IVX\d]+)|\d+\.\d+')
+_CLAUSE_TITLE_RE = re.compile(r'[A-Z][A-Z\s]{10,}$|[A-Z][a-z]+(?:\s+[A-Z][a-z]*)*\s*$')
+_INVALID_CLAUSE_RE = re.compile(r'\s*(?:_+|signature|date|name|[\(\)\[\]\{\}]+)\s*$', re.IGNORECASE)
+_HEADER_OR_SIGNATURE_RE = re.compile(
+    r'[A-Z\s]{5,}$'
+    r'|\s*(?:signature|date|name|title|company)\s*:?\s*_*\s*$'
+    r'|\s*page\s+\d+'
+    r'|\s*(?:appendix|exhibit|schedule)\s+[A-Z\d]',
+    re.IGNORECASE
+)
+
+def _keyword_finder(keywords):
+    """Return a function giving the set of keywords found in lowercase text"""
+    return lambda text: {keyword for keyword in keywords if keyword in text}
+
+# Indicators scored by validate_legal_document. All four groups are found
+# in one pass over the document text.
+_LEGAL_KEYWORDS = frozenset([
+    'agreement', 'contract', 'terms', 'conditions', 'party', 'parties',
+    'whereas', 'hereby', 'shall', 'obligations', 'rights', 'liabilities',
+    'covenant', 'warranty', 'indemnify', 'governing law', 'jurisdiction',
+    'breach', 'termination', 'execution', 'effective date', 'consideration'
+])
+_CONTRACT_TYPES = frozenset([
+    'employment agreement', 'service agreement', 'license agreement',
+    'non-disclosure agreement', 'nda', 'purchase agreement', 'sale agreement',
+    'lease agreement', 'rental agreement', 'partnership agreement',
+    'joint venture', 'memorandum of understanding', 'mou',
+    'terms of service', 'privacy policy', 'end user license',
+    'software license', 'consulting agreement', 'contractor agreement'
+])
+_LEGAL_STRUCTURES = frozenset([
+    'article', 'section', 'clause', 'paragraph', 'subsection',
+    'schedule', 'exhibit', 'appendix', 'addendum', 'amendment'
+])
+_SIGNATURE_INDICATORS = frozenset([
+    'signature', 'signed', 'executed', 'witness whereof', 'in witness',
+    'executed on', 'signed on', 'date of execution', 'effective date'
+])
+_find_document_indicators = _keyword_finder(
+    _LEGAL_KEYWORDS | _CONTRACT_TYPES | _LEGAL_STRUCTURES | _SIGNATURE_INDICATORS
+)
+
+# Legal-language indicators counted by is_legal_clause_content
+_LEGAL_LANGUAGE_INDICATORS = frozenset([
+    'shall', 'will', 'agrees', 'covenants', 'represents', 'warrants',
+    'obligations', 'rights', 'liable', 'responsible', 'pursuant to',
+    'subject to', 'in accordance with', 'notwithstanding', 'provided that'
+])
+_find_legal_language = _keyword_finder(_LEGAL_LANGUAGE_INDICATORS)
+
+# Keyword -> clause type for identify_clause_type; the first type in
+# _CLAUSE_TYPE_PRIORITY with a match wins
+_CLAUSE_TYPE_KEYWORDS = {
+    'termination': 'Termination', 'terminate': 'Termination', 'end': 'Termination',
+    'expiry': 'Termination', 'dissolution': 'Termination',
+    'payment': 'Payment', 'compensation': 'Payment', 'salary': 'Payment',
+    'fee': 'Payment', 'remuneration': 'Payment',
+    'liability': 'Liability', 'liable': 'Liability', 'damages': 'Liability',
+    'loss': 'Liability', 'harm': 'Liability',
+    'confidential': 'Confidentiality', 'non-disclosure': 'Confidentiality',
+    'proprietary': 'Confidentiality', 'secret': 'Confidentiality',
+    'intellectual property': 'Intellectual Property', 'copyright': 'Intellectual Property',
+    'patent': 'Intellectual Property', 'trademark': 'Intellectual Property',
+    'governing law': 'Governing Law', 'jurisdiction': 'Governing Law',
+    'courts': 'Governing Law', 'legal': 'Governing Law',
+    'terms': 'General Terms', 'conditions': 'General Terms',
+    'provisions': 'General Terms', 'clause': 'General Terms',
+}
+_CLAUSE_TYPE_PRIORITY = (
+    'Termination', 'Payment', 'Liability', 'Confidentiality',
+    'Intellectual Property', 'Governing Law', 'General Terms'
+)
+_find_clause_type_keywords = _keyword_finder(_CLAUSE_TYPE_KEYWORDS)
+
+# Worker threads for per-clause Gemini calls, shared by warm invocations
+CLAUSE_ANALYSIS_WORKERS = 4
+_CLAUSE_EXECUTOR = ThreadPoolExecutor(max_workers=CLAUSE_ANALYSIS_WORKERS)
+
+# Extracted text of recently uploaded PDFs, keyed by a digest of the file
+# bytes, so re-analyzing the same contract (e.g. in another language) on a
+# warm instance skips PyMuPDF
+PDF_TEXT_CACHE_SIZE = 16
+_PDF_TEXT_CACHE = OrderedDict()
+_PDF_TEXT_CACHE_LOCK = threading.Lock()
+
+# Canned per-clause analyses for generate_mock_risk_analysis, assigned in
+# this order; each clause gets its own copy
+_MOCK_CLAUSE_ANALYSES = (
+    {
+        'risk_level': 'High',
+        'analysis': 'This clause presents significant legal and financial risks. The terms are heavily skewed and may be difficult to enforce. Recommend immediate legal review and renegotiation.'
+    },
+    {
+        'risk_level': 'Medium',
+        'analysis': 'This clause has moderate risk factors that should be reviewed. While generally acceptable, some terms could be clarified or improved through negotiation.'
+    },
+    {
+        'risk_level': 'Low',
+        'analysis': 'This clause appears to be standard and balanced. The terms are fair and pose minimal risk to both parties. Generally acceptable as written.'
+    },
+)
+
 class handler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
         self.send_response(200)
@@ -19,14 +143,6 @@ class handler(BaseHTTPRequestHandler):
 
     def do_POST(self):
         try:
-            # Handle CORS
-            self.send_response(200)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
             # Parse multipart form data
             content_type = self.headers.get('Content-Type', '')
             if not content_type.startswith('multipart/form-data'):
@@ -34,7 +150,7 @@ class handler(BaseHTTPRequestHandler):
                     'status': 'error',
                     'error': 'Expected multipart/form-data content type'
                 }
-                self.wfile.write(json.dumps(error_response).encode())
+                self.send_json(error_response)
                 return
             
             # Parse form data
@@ -58,7 +174,7 @@ class handler(BaseHTTPRequestHandler):
                     'status': 'error',
                     'error': 'No file uploaded'
                 }
-                self.wfile.write(json.dumps(error_response).encode())
+                self.send_json(error_response)
                 return
             
             file_item = form['file']
@@ -67,7 +183,7 @@ class handler(BaseHTTPRequestHandler):
                     'status': 'error',
                     'error': 'No file selected'
                 }
-                self.wfile.write(json.dumps(error_response).encode())
+                self.send_json(error_response)
                 return
             
             filename = file_item.filename
@@ -79,22 +195,17 @@ class handler(BaseHTTPRequestHandler):
                     'status': 'error',
                     'error': 'Only PDF files are supported'
                 }
-                self.wfile.write(json.dumps(error_response).encode())
+                self.send_json(error_response)
                 return
             
             # Process PDF and perform analysis
             result = self.analyze_contract(file_data, filename, language, interests)
             
             # Return result
-            self.wfile.write(json.dumps(result).encode())
+            self.send_json(result)
             
         except Exception as e:
             try:
-                self.send_response(500)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                
                 error_response = {
                     'status': 'error',
                     'error': f'Analysis processing error: {str(e)}',
@@ -111,11 +222,29 @@ class handler(BaseHTTPRequestHandler):
                 print(f"Analysis error: {str(e)}")
                 print(f"Error type: {type(e).__name__}")
                 
-                self.wfile.write(json.dumps(error_response).encode())
+                self.send_response(500)
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers_with_body(_dumps(error_response))
             except:
                 # Fallback if even error handling fails
                 pass
 
+    def send_json(self, result):
+        """Send result as a 200 JSON response with CORS headers"""
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers_with_body(_dumps(result))
+
+    def end_headers_with_body(self, body):
+        """Send Content-Length, the end of the headers and body together"""
+        self.send_header('Content-Length', str(len(body)))
+        self._headers_buffer.append(b"\r\n" + body)
+        self.flush_headers()
+
     def analyze_contract(self, file_data, filename, language, interests):
         """Complete contract analysis workflow"""
         try:
@@ -183,25 +312,39 @@ class handler(BaseHTTPRequestHandler):
 
     def extract_pdf_text(self, file_data):
         """Extract text from PDF using PyMuPDF"""
+        key = hashlib.blake2b(file_data, digest_size=16).digest()
+        with _PDF_TEXT_CACHE_LOCK:
+            cached = _PDF_TEXT_CACHE.get(key)
+            if cached is not None:
+                _PDF_TEXT_CACHE.move_to_end(key)
+                return cached
+        
         try:
+            # PyMuPDF is a large native extension; load it only when a PDF
+            # actually needs parsing
+            import fitz
+            
             # Create a temporary file-like object
             pdf_stream = io.BytesIO(file_data)
             
             # Open PDF with PyMuPDF
             pdf_document = fitz.open(stream=pdf_stream, filetype="pdf")
             
-            full_text = ""
-            for page_num in range(len(pdf_document)):
-                page = pdf_document.load_page(page_num)
-                page_text = page.get_text()
-                full_text += page_text + "\n\n"
+            # One join over the pages instead of regrowing the string per page
+            full_text = "\n\n".join(page.get_text() for page in pdf_document)
             
             pdf_document.close()
             
-            if not full_text.strip():
+            full_text = full_text.strip()
+            if not full_text:
                 raise Exception("No text could be extracted from the PDF")
             
-            return full_text.strip()
+            with _PDF_TEXT_CACHE_LOCK:
+                _PDF_TEXT_CACHE[key] = full_text
+                if len(_PDF_TEXT_CACHE) > PDF_TEXT_CACHE_SIZE:
+                    _PDF_TEXT_CACHE.popitem(last=False)
+            
+            return full_text
             
         except Exception as e:
             print(f"PDF extraction error: {e}")
@@ -244,36 +387,6 @@ Company: _________________    Employee: _________________"""
             # Convert to lowercase for case-insensitive matching
             text_lower = contract_text.lower()
             
-            # Legal document indicators
-            legal_keywords = [
-                'agreement', 'contract', 'terms', 'conditions', 'party', 'parties',
-                'whereas', 'hereby', 'shall', 'obligations', 'rights', 'liabilities',
-                'covenant', 'warranty', 'indemnify', 'governing law', 'jurisdiction',
-                'breach', 'termination', 'execution', 'effective date', 'consideration'
-            ]
-            
-            # Contract type indicators
-            contract_types = [
-                'employment agreement', 'service agreement', 'license agreement',
-                'non-disclosure agreement', 'nda', 'purchase agreement', 'sale agreement',
-                'lease agreement', 'rental agreement', 'partnership agreement',
-                'joint venture', 'memorandum of understanding', 'mou',
-                'terms of service', 'privacy policy', 'end user license',
-                'software license', 'consulting agreement', 'contractor agreement'
-            ]
-            
-            # Legal structure indicators
-            legal_structures = [
-                'article', 'section', 'clause', 'paragraph', 'subsection',
-                'schedule', 'exhibit', 'appendix', 'addendum', 'amendment'
-            ]
-            
-            # Signature/execution indicators
-            signature_indicators = [
-                'signature', 'signed', 'executed', 'witness whereof', 'in witness',
-                'executed on', 'signed on', 'date of execution', 'effective date'
-            ]
-            
             # Check minimum length
             if len(contract_text.strip()) < 200:
                 return {
@@ -284,33 +397,33 @@ Company: _________________    Employee: _________________"""
             
             # Count legal indicators
             legal_score = 0
+            indicators = _find_document_indicators(text_lower)
             
             # Check for legal keywords
-            legal_keyword_count = sum(1 for keyword in legal_keywords if keyword in text_lower)
+            legal_keyword_count = len(indicators & _LEGAL_KEYWORDS)
             legal_score += min(legal_keyword_count, 10)  # Cap at 10 points
             
             # Check for contract types
-            contract_type_found = any(contract_type in text_lower for contract_type in contract_types)
+            contract_type_found = not indicators.isdisjoint(_CONTRACT_TYPES)
             if contract_type_found:
                 legal_score += 15
             
             # Check for legal structure
-            structure_count = sum(1 for structure in legal_structures if structure in text_lower)
+            structure_count = len(indicators & _LEGAL_STRUCTURES)
             legal_score += min(structure_count * 2, 10)  # Cap at 10 points
             
             # Check for signature indicators
-            signature_found = any(indicator in text_lower for indicator in signature_indicators)
+            signature_found = not indicators.isdisjoint(_SIGNATURE_INDICATORS)
             if signature_found:
                 legal_score += 10
             
             # Check for numbered clauses/sections
-            import re
-            numbered_sections = len(re.findall(r'\b\d+\.\s*[A-Z]', contract_text))
+            numbered_sections = len(_NUMBERED_SECTION_RE.findall(contract_text))
             if numbered_sections >= 3:
                 legal_score += 10
             
             # Check for legal formatting patterns
-            if re.search(r'\bWHEREAS\b.*\bNOW THEREFORE\b', contract_text, re.IGNORECASE | re.DOTALL):
+            if _RECITALS_RE.search(contract_text):
                 legal_score += 15
             
             # Validation threshold
@@ -378,34 +491,41 @@ Company: _________________    Employee: _________________"""
             clauses = {}
             
             # Method 1: Split by periods first (as requested)
-            sentences = [s.strip() for s in contract_text.split('.') if s.strip()]
+            sentences = [s for s in (part.strip() for part in contract_text.split('.')) if s]
             
-            # Combine short sentences into meaningful clauses
+            # Combine short sentences into meaningful clauses. Each sentence is
+            # scanned once as it is added, rather than rescanning the whole
+            # pending clause every time it grows.
             combined_clauses = []
-            current_clause = ""
+            current_parts = []
+            current_length = 0
+            has_marker = False
             
             for sentence in sentences:
-                sentence = sentence.strip()
-                if not sentence:
-                    continue
-                    
                 # Add sentence to current clause
-                current_clause += sentence + ". "
+                current_parts.append(sentence)
+                current_length += len(sentence) + 2
+                
+                # Legal keywords or common clause endings mark a complete clause
+                if not has_marker:
+                    sentence_lower = sentence.lower()
+                    has_marker = (
+                        any(keyword in sentence_lower for keyword in legal_clause_keywords)
+                        or any(ending in sentence_lower for ending in ['agreement', 'contract', 'provision', 'clause', 'section'])
+                    )
                 
                 # Check if this completes a clause (minimum 100 characters for substantial content)
-                if len(current_clause) >= 100:
-                    # Check if it contains legal keywords
-                    if any(keyword in current_clause.lower() for keyword in legal_clause_keywords):
-                        combined_clauses.append(current_clause.strip())
-                        current_clause = ""
-                    # Or if it ends with common clause endings
-                    elif any(ending in current_clause.lower() for ending in ['agreement', 'contract', 'provision', 'clause', 'section']):
-                        combined_clauses.append(current_clause.strip())
-                        current_clause = ""
+                if current_length >= 100 and has_marker:
+                    combined_clauses.append(". ".join(current_parts) + ".")
+                    current_parts = []
+                    current_length = 0
+                    has_marker = False
             
             # Add remaining content as final clause if substantial
-            if current_clause.strip() and len(current_clause.strip()) >= 100:
-                combined_clauses.append(current_clause.strip())
+            if current_parts:
+                remaining = ". ".join(current_parts) + "."
+                if len(remaining) >= 100:
+                    combined_clauses.append(remaining)
             
             # Create numbered clauses from combined content
             for i, clause_content in enumerate(combined_clauses, 1):
@@ -417,8 +537,9 @@ Company: _________________    Employee: _________________"""
                     else:
                         # Identify clause type by keywords
                         clause_type = "General Provision"
+                        content_lower = clause_content.lower()
                         for keyword in legal_clause_keywords:
-                            if keyword in clause_content.lower():
+                            if keyword in content_lower:
                                 clause_type = keyword.title().replace('_', ' ')
                                 break
                         clause_title = f"Clause {i}: {clause_type}"
@@ -439,9 +560,7 @@ Company: _________________    Employee: _________________"""
                         continue
                     
                     # Check for numbered clause headers: "1.", "2.", "1.1", "Article 1", "Section 1", etc.
-                    if (re.match(r'^\d+\.?\s*[A-Z]', line) or 
-                        re.match(r'^(Article|Section|Clause)\s+[IVX\d]+', line, re.IGNORECASE) or
-                        re.match(r'^\d+\.\d+', line)):
+                    if _CLAUSE_HEADER_RE.match(line):
                         
                         # Save previous clause if it exists
                         if current_clause_title and current_clause_content:
@@ -455,8 +574,7 @@ Company: _________________    Employee: _________________"""
                         clause_number += 1
                     
                     # Check for titled sections (ALL CAPS or Title Case)
-                    elif (re.match(r'^[A-Z][A-Z\s]{10,}$', line) or  # ALL CAPS titles
-                          re.match(r'^[A-Z][a-z]+(\s+[A-Z][a-z]*)*\s*$', line)):  # Title Case
+                    elif _CLAUSE_TITLE_RE.match(line):  # ALL CAPS or Title Case
                         
                         # Save previous clause
                         if current_clause_title and current_clause_content:
@@ -485,7 +603,7 @@ Company: _________________    Employee: _________________"""
             
             # Method 3: If still no clear structure found, split by paragraphs and identify by content
             if len(clauses) < 2:
-                paragraphs = [p.strip() for p in contract_text.split('\n\n') if p.strip()]
+                paragraphs = [p for p in (part.strip() for part in contract_text.split('\n\n')) if p]
                 
                 for i, paragraph in enumerate(paragraphs):
                     if len(paragraph) > 100:  # Substantial content
@@ -537,37 +655,16 @@ Company: _________________    Employee: _________________"""
         # Must contain at least one legal keyword
         keyword_found = any(keyword in content_lower for keyword in legal_keywords)
         
-        # Legal language indicators
-        legal_indicators = [
-            'shall', 'will', 'agrees', 'covenants', 'represents', 'warrants',
-            'obligations', 'rights', 'liable', 'responsible', 'pursuant to',
-            'subject to', 'in accordance with', 'notwithstanding', 'provided that'
-        ]
-        
-        legal_language_count = sum(1 for indicator in legal_indicators if indicator in content_lower)
+        # Distinct legal language indicators, found in one pass
+        legal_language_count = len(_find_legal_language(content_lower))
         
         # Should have legal language and reasonable length
         return keyword_found and legal_language_count >= 2 and len(content) > 50
 
     def identify_clause_type(self, content, legal_keywords):
         """Identify the type of legal clause based on content"""
-        content_lower = content.lower()
-        
-        clause_types = {
-            'Termination': ['termination', 'terminate', 'end', 'expiry', 'dissolution'],
-            'Payment': ['payment', 'compensation', 'salary', 'fee', 'remuneration'],
-            'Liability': ['liability', 'liable', 'damages', 'loss', 'harm'],
-            'Confidentiality': ['confidential', 'non-disclosure', 'proprietary', 'secret'],
-            'Intellectual Property': ['intellectual property', 'copyright', 'patent', 'trademark'],
-            'Governing Law': ['governing law', 'jurisdiction', 'courts', 'legal'],
-            'General Terms': ['terms', 'conditions', 'provisions', 'clause']
-        }
-        
-        for clause_type, keywords in clause_types.items():
-            if any(keyword in content_lower for keyword in keywords):
-                return clause_type
-        
-        return 'General Provision'
+        found = {_CLAUSE_TYPE_KEYWORDS[keyword] for keyword in _find_clause_type_keywords(content.lower())}
+        return next((clause_type for clause_type in _CLAUSE_TYPE_PRIORITY if clause_type in found), 'General Provision')
 
     def validate_legal_clause(self, clause_text):
         """Validate that a clause is legitimate legal content"""
@@ -582,18 +679,9 @@ Company: _________________    Employee: _________________"""
         if not any(verb in clause_lower for verb in legal_verbs):
             return False
         
-        # Should not be just contact info, signatures, or formatting
-        invalid_patterns = [
-            r'^\s*_+\s*$',  # Just underscores
-            r'^\s*signature\s*$',  # Just "signature"
-            r'^\s*date\s*$',  # Just "date"
-            r'^\s*name\s*$',  # Just "name"
-            r'^\s*[\(\)\[\]\{\}]+\s*$',  # Just brackets
-        ]
-        
-        for pattern in invalid_patterns:
-            if re.match(pattern, clause_text, re.IGNORECASE):
-                return False
+        # Should not be just underscores, "signature"/"date"/"name", or brackets
+        if _INVALID_CLAUSE_RE.match(clause_text):
+            return False
         
         return True
 
@@ -605,19 +693,9 @@ Company: _________________    Employee: _________________"""
         if len(text_clean) < 30:
             return True
         
-        # Common headers/signatures
-        header_patterns = [
-            r'^[A-Z\s]{5,}$',  # All caps headers
-            r'^\s*(signature|date|name|title|company)\s*:?\s*_*\s*$',
-            r'^\s*page\s+\d+',  # Page numbers
-            r'^\s*(appendix|exhibit|schedule)\s+[A-Z\d]',
-        ]
-        
-        for pattern in header_patterns:
-            if re.match(pattern, text_clean, re.IGNORECASE):
-                return True
-        
-        return False
+        # Common headers/signatures: all caps headers, signature and date
+        # lines, page numbers, appendix/exhibit/schedule headings
+        return bool(_HEADER_OR_SIGNATURE_RE.match(text_clean))
 
     def analyze_clauses_with_gemini(self, clauses, language):
         """Analyze each clause for risks using Gemini AI"""
@@ -628,15 +706,36 @@ Company: _________________    Employee: _________________"""
                 print("GEMINI_API_KEY not found, using mock analysis")
                 return self.generate_mock_risk_analysis(clauses)
             
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            model = _gemini_model(api_key)
             
             risk_report = {}
             
+            # Clauses are independent and each call mostly waits on the
+            # network, so analyze them concurrently; the report keeps the
+            # clause order. Repeated boilerplate found under several titles
+            # is sent to Gemini only once.
+            futures_by_text = {}
+            futures = {}
             for clause_id, clause_text in clauses.items():
-                try:
-                    # Create risk analysis prompt
-                    prompt = f"""
+                future = futures_by_text.get(clause_text)
+                if future is None:
+                    future = _CLAUSE_EXECUTOR.submit(self.analyze_clause_with_gemini, model, clause_id, clause_text)
+                    futures_by_text[clause_text] = future
+                futures[clause_id] = future
+            for clause_id, future in futures.items():
+                risk_report[clause_id] = future.result()
+            
+            return risk_report
+            
+        except Exception as e:
+            print(f"Gemini analysis error: {e}")
+            return self.generate_mock_risk_analysis(clauses)
+
+    def analyze_clause_with_gemini(self, model, clause_id, clause_text):
+        """Return the risk report entry for one clause"""
+        try:
+            # Create risk analysis prompt
+            prompt = f"""
 You are a legal AI assistant specializing in contract risk analysis. Please analyze the following contract clause and provide a risk assessment.
 
 CLAUSE: {clause_text}
@@ -657,72 +756,52 @@ Consider these factors:
 
 Respond only with valid JSON."""
 
-                    response = model.generate_content(prompt)
-                    response_text = response.text.strip()
-                    
-                    # Try to parse JSON response
-                    try:
-                        if response_text.startswith('```json'):
-                            response_text = response_text.replace('```json', '').replace('```', '').strip()
-                        elif response_text.startswith('```'):
-                            response_text = response_text.replace('```', '').strip()
-                        
-                        analysis_result = json.loads(response_text)
-                        
-                        risk_report[clause_id] = {
-                            'text': clause_text,
-                            'analysis': analysis_result
-                        }
-                    except json.JSONDecodeError:
-                        # Fallback if JSON parsing fails
-                        risk_report[clause_id] = {
-                            'text': clause_text,
-                            'analysis': {
-                                'risk_level': 'Medium',
-                                'analysis': response_text[:500] + "..." if len(response_text) > 500 else response_text
-                            }
-                        }
+            response = model.generate_content(prompt)
+            response_text = response.text.strip()
+            
+            # Try to parse JSON response
+            try:
+                if response_text.startswith('```json'):
+                    response_text = response_text.replace('```json', '').replace('```', '').strip()
+                elif response_text.startswith('```'):
+                    response_text = response_text.replace('```', '').strip()
+                
+                analysis_result = json.loads(response_text)
                 
-                except Exception as e:
-                    print(f"Error analyzing clause {clause_id}: {e}")
-                    # Add fallback analysis
-                    risk_report[clause_id] = {
-                        'text': clause_text,
-                        'analysis': {
-                            'risk_level': 'Medium',
-                            'analysis': f'Could not complete AI analysis for this clause. Manual review recommended.'
-                        }
+                return {
+                    'text': clause_text,
+                    'analysis': analysis_result
+                }
+            except json.JSONDecodeError:
+                # Fallback if JSON parsing fails
+                return {
+                    'text': clause_text,
+                    'analysis': {
+                        'risk_level': 'Medium',
+                        'analysis': response_text[:500] + "..." if len(response_text) > 500 else response_text
                     }
-            
-            return risk_report
-            
+                }
+        
         except Exception as e:
-            print(f"Gemini analysis error: {e}")
-            return self.generate_mock_risk_analysis(clauses)
+            print(f"Error analyzing clause {clause_id}: {e}")
+            # Add fallback analysis
+            return {
+                'text': clause_text,
+                'analysis': {
+                    'risk_level': 'Medium',
+                    'analysis': f'Could not complete AI analysis for this clause. Manual review recommended.'
+                }
+            }
 
     def generate_mock_risk_analysis(self, clauses):
         """Generate mock risk analysis when Gemini is not available"""
-        risk_levels = ['High', 'Medium', 'Low']
-        risk_report = {}
-        
-        for i, (clause_id, clause_text) in enumerate(clauses.items()):
-            risk_level = risk_levels[i % len(risk_levels)]
-            
-            risk_analysis = {
-                'High': 'This clause presents significant legal and financial risks. The terms are heavily skewed and may be difficult to enforce. Recommend immediate legal review and renegotiation.',
-                'Medium': 'This clause has moderate risk factors that should be reviewed. While generally acceptable, some terms could be clarified or improved through negotiation.',
-                'Low': 'This clause appears to be standard and balanced. The terms are fair and pose minimal risk to both parties. Generally acceptable as written.'
-            }
-            
-            risk_report[clause_id] = {
+        return {
+            clause_id: {
                 'text': clause_text,
-                'analysis': {
-                    'risk_level': risk_level,
-                    'analysis': risk_analysis[risk_level]
-                }
+                'analysis': dict(_MOCK_CLAUSE_ANALYSES[i % len(_MOCK_CLAUSE_ANALYSES)])
             }
-        
-        return risk_report
+            for i, (clause_id, clause_text) in enumerate(clauses.items())
+        }
 
     def generate_summary(self, risk_report, contract_text, language):
         """Generate human-readable summary using Gemini"""
@@ -731,8 +810,7 @@ Respond only with valid JSON."""
             if not api_key:
                 return self.generate_mock_summary(risk_report)
             
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            model = _gemini_model(api_key)
             
             # Count risk levels
             risk_counts = {'High': 0, 'Medium': 0, 'Low': 0}
@@ -838,14 +916,13 @@ Write the summary as if explaining to a business person who needs to make inform
             }
 
     def do_GET(self):
-        self.send_response(405)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        
         error_response = {
             'error': 'Method not allowed. Use POST to upload files.',
             'type': 'method_error',
             'status': 'error'
         }
-        self.wfile.write(json.dumps(error_response).encode())
+        
+        self.send_response(405)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers_with_body(_dumps(error_response))
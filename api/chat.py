@@ -1,11 +1,31 @@
 import json
 import os
-import google.generativeai as genai
+import re
+from functools import lru_cache
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import parse_qs, urlparse
 import time
 import hashlib
-import base64
+import threading
+import traceback
+from collections import OrderedDict
+
+# SIMD base64 for the MP3 payload, stdlib as fallback
+try:
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+
+# orjson serializes responses straight to bytes (the chat payload can carry
+# base64 TTS audio) and parses request bytes without a decode
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+    _loads = json.loads
 
 # Load environment variables
 try:
@@ -17,10 +37,94 @@ except ImportError:
 # Try to import ElevenLabs for TTS
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     ELEVENLABS_AVAILABLE = True
 except ImportError:
     ELEVENLABS_AVAILABLE = False
 
+# Shared session so warm instances reuse keep-alive TLS connections to
+# api.elevenlabs.io instead of handshaking on every call
+if ELEVENLABS_AVAILABLE:
+    _HTTP_SESSION = requests.Session()
+    _HTTP_SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
+else:
+    _HTTP_SESSION = None
+
+@lru_cache(maxsize=1)
+def _gemini_model(api_key):
+    """Shared gemini-1.5-flash model, configured once per API key"""
+    import google.generativeai as genai  # loaded on first use to keep cold starts light
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-1.5-flash')
+
+# Recent Gemini answers keyed by the normalized question and the contract
+# context it was asked against, so a warm instance answers re-submitted or
+# trivially reworded questions (case, spacing, trailing punctuation)
+# without another model call, but never with another contract's answer
+RESPONSE_CACHE_SIZE = 256
+_RESPONSE_CACHE = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+def _response_cache_key(kind, message, contract_context):
+    normalized = ' '.join(message.lower().split()).rstrip('?!. ')
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=16)
+    if contract_context:
+        digest.update(b'\0' + json.dumps(contract_context, sort_keys=True, default=str).encode('utf-8'))
+    return f"{kind}:{digest.hexdigest()}"
+
+def _response_cache_get(key):
+    with _RESPONSE_CACHE_LOCK:
+        response = _RESPONSE_CACHE.get(key)
+        if response is not None:
+            _RESPONSE_CACHE.move_to_end(key)
+        return response
+
+def _response_cache_put(key, response):
+    with _RESPONSE_CACHE_LOCK:
+        _RESPONSE_CACHE[key] = response
+        _RESPONSE_CACHE.move_to_end(key)
+        if len(_RESPONSE_CACHE) > RESPONSE_CACHE_SIZE:
+            _RESPONSE_CACHE.popitem(last=False)
+
+def _keyword_regex(keywords):
+    """One-pass regex over keywords. The lookahead reports overlapping
+    matches too, so it finds every keyword a substring check would."""
+    return re.compile('(?=(' + '|'.join(map(re.escape, keywords)) + '))')
+
+def _first_topic(text, keyword_re, keywords, priority):
+    """Highest-priority topic whose keyword occurs in text, or None"""
+    found = {keywords[m.group(1)] for m in keyword_re.finditer(text.lower())}
+    return next((topic for topic in priority if topic in found), None)
+
+# Keyword -> message type for classify_message_type; when several types
+# match, the first in _MESSAGE_TYPE_PRIORITY wins
+_MESSAGE_TYPE_KEYWORDS = {
+    'risk': 'risk_assessment', 'dangerous': 'risk_assessment', 'problem': 'risk_assessment', 'issue': 'risk_assessment',
+    'termination': 'termination', 'end': 'termination', 'quit': 'termination', 'fire': 'termination',
+    'payment': 'compensation', 'salary': 'compensation', 'compensation': 'compensation', 'money': 'compensation',
+    'confidential': 'confidentiality', 'nda': 'confidentiality', 'secret': 'confidentiality', 'proprietary': 'confidentiality',
+    'negotiate': 'negotiation', 'change': 'negotiation', 'modify': 'negotiation', 'improve': 'negotiation',
+}
+_MESSAGE_TYPE_PRIORITY = ('risk_assessment', 'termination', 'compensation', 'confidentiality', 'negotiation')
+_MESSAGE_TYPE_RE = _keyword_regex(_MESSAGE_TYPE_KEYWORDS)
+
+# Keyword -> topic and canned reply for get_voice_fallback_response, same scheme
+_VOICE_TOPIC_KEYWORDS = {
+    'risk': 'risk', 'dangerous': 'risk', 'problem': 'risk',
+    'termination': 'termination', 'quit': 'termination', 'fired': 'termination',
+    'confidential': 'confidentiality', 'nda': 'confidentiality', 'secret': 'confidentiality',
+    'money': 'payment', 'salary': 'payment', 'payment': 'payment', 'pay': 'payment',
+    'negotiate': 'negotiation', 'change': 'negotiation', 'better': 'negotiation',
+}
+_VOICE_TOPIC_PRIORITY = ('risk', 'termination', 'confidentiality', 'payment', 'negotiation')
+_VOICE_TOPIC_RE = _keyword_regex(_VOICE_TOPIC_KEYWORDS)
+_VOICE_FALLBACK_RESPONSES = {
+    'risk': "I understand you're concerned about risks in your contract. The main areas to watch are termination terms, liability clauses, and intellectual property rights. These can really impact your future. Would you like me to explain any specific section?",
+    'termination': "Termination clauses are super important to understand. Most contracts need two to four weeks notice, but yours might be different. Look for severance terms and any restrictions after you leave. What specific part worries you most?",
+    'confidentiality': "Confidentiality terms protect company secrets, but they shouldn't be too broad. You should still be able to use your general skills at future jobs. The key is making sure it's reasonable in scope and time. Does yours seem overly restrictive?",
+    'payment': "Payment terms should be crystal clear in your contract. Make sure you understand the exact amounts, when you get paid, and any performance bonuses. Also check expense policies and benefit contributions. Is there something specific about the payment terms that concerns you?",
+    'negotiation': "Good thinking about negotiation! Focus on what matters most to you - maybe salary, flexible work, or better termination terms. Come prepared with specific alternatives and be ready to explain why they're fair. What's your top priority to negotiate?",
+}
 class handler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
         self.send_response(200)
@@ -31,14 +135,6 @@ class handler(BaseHTTPRequestHandler):
 
     def do_POST(self):
         try:
-            # Handle CORS
-            self.send_response(200)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
-            
             # Parse query parameters for action
             query_components = dict(parse_qs(urlparse(self.path).query))
             action = query_components.get('action', ['chat'])[0]
@@ -46,9 +142,9 @@ class handler(BaseHTTPRequestHandler):
             # Get request data
             content_length = int(self.headers.get('Content-Length', 0))
             if content_length > 0:
-                body = self.rfile.read(content_length).decode('utf-8')
+                body = self.rfile.read(content_length)
                 try:
-                    data = json.loads(body)
+                    data = _loads(body)
                 except:
                     data = {}
             else:
@@ -68,25 +164,35 @@ class handler(BaseHTTPRequestHandler):
             else:
                 response_data = self.handle_single_chat(data)
             
-            self.wfile.write(json.dumps(response_data).encode())
+            # Handle CORS
+            self.send_response(200)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+            self.send_header('Content-Type', 'application/json')
+            self.end_headers_with_body(_dumps(response_data))
             
         except Exception as e:
             try:
-                self.send_response(500)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                
                 error_response = {
                     'error': f'Chat error: {str(e)}',
                     'status': 'error'
                 }
                 
                 print(f"Chat error: {str(e)}")
-                self.wfile.write(json.dumps(error_response).encode())
+                self.send_response(500)
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers_with_body(_dumps(error_response))
             except:
                 pass
 
+    def end_headers_with_body(self, body):
+        """Send Content-Length, the end of the headers and body together"""
+        self.send_header('Content-Length', str(len(body)))
+        self._headers_buffer.append(b"\r\n" + body)
+        self.flush_headers()
+
     def handle_single_chat(self, data):
         """Handle single chat message with enhanced legal assistance"""
         try:
@@ -262,8 +368,12 @@ class handler(BaseHTTPRequestHandler):
             if not api_key:
                 return self.get_voice_fallback_response(message, contract_context)
             
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            cache_key = _response_cache_key('voice', message, contract_context)
+            cached = _response_cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
+            model = _gemini_model(api_key)
             
             # Voice-specific system prompt
             voice_system_prompt = """You are NyayMitra AI, a voice-enabled legal assistant. Respond as if speaking to the user directly.
@@ -288,7 +398,9 @@ User said: "{message}"
 Provide a natural, conversational spoken response:"""
 
             response = model.generate_content(voice_prompt)
-            return response.text.strip()
+            answer = response.text.strip()
+            _response_cache_put(cache_key, answer)
+            return answer
             
         except Exception as e:
             print(f"Voice response error: {e}")
@@ -296,30 +408,16 @@ Provide a natural, conversational spoken response:"""
 
     def get_voice_fallback_response(self, message, contract_context):
         """Voice-optimized fallback responses"""
-        message_lower = message.lower()
-        
         # Voice-friendly responses for common topics
-        if 'risk' in message_lower or 'dangerous' in message_lower or 'problem' in message_lower:
-            return "I understand you're concerned about risks in your contract. The main areas to watch are termination terms, liability clauses, and intellectual property rights. These can really impact your future. Would you like me to explain any specific section?"
-        
-        elif 'termination' in message_lower or 'quit' in message_lower or 'fired' in message_lower:
-            return "Termination clauses are super important to understand. Most contracts need two to four weeks notice, but yours might be different. Look for severance terms and any restrictions after you leave. What specific part worries you most?"
+        topic = _first_topic(message, _VOICE_TOPIC_RE, _VOICE_TOPIC_KEYWORDS, _VOICE_TOPIC_PRIORITY)
+        if topic is not None:
+            return _VOICE_FALLBACK_RESPONSES[topic]
         
-        elif 'confidential' in message_lower or 'nda' in message_lower or 'secret' in message_lower:
-            return "Confidentiality terms protect company secrets, but they shouldn't be too broad. You should still be able to use your general skills at future jobs. The key is making sure it's reasonable in scope and time. Does yours seem overly restrictive?"
-        
-        elif 'money' in message_lower or 'salary' in message_lower or 'payment' in message_lower or 'pay' in message_lower:
-            return "Payment terms should be crystal clear in your contract. Make sure you understand the exact amounts, when you get paid, and any performance bonuses. Also check expense policies and benefit contributions. Is there something specific about the payment terms that concerns you?"
-        
-        elif 'negotiate' in message_lower or 'change' in message_lower or 'better' in message_lower:
-            return "Good thinking about negotiation! Focus on what matters most to you - maybe salary, flexible work, or better termination terms. Come prepared with specific alternatives and be ready to explain why they're fair. What's your top priority to negotiate?"
-        
-        else:
-            response = f"Thanks for asking about your contract. I'm here to help you understand the legal terms and spot any issues. "
-            if contract_context:
-                response += "Since you've uploaded a contract, I can give you specific advice about your document. "
-            response += "What specific part would you like me to explain first?"
-            return response
+        response = f"Thanks for asking about your contract. I'm here to help you understand the legal terms and spot any issues. "
+        if contract_context:
+            response += "Since you've uploaded a contract, I can give you specific advice about your document. "
+        response += "What specific part would you like me to explain first?"
+        return response
 
     def generate_speech_with_elevenlabs(self, text):
         """Generate speech using ElevenLabs TTS API - primary TTS method"""
@@ -365,7 +463,7 @@ Provide a natural, conversational spoken response:"""
             }
             
             print("ElevenLabs TTS: Making API request...")
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = _HTTP_SESSION.post(url, json=data, headers=headers, timeout=30)
             
             print(f"ElevenLabs TTS: Response status: {response.status_code}")
             print(f"ElevenLabs TTS: Response headers: {dict(response.headers)}")
@@ -379,7 +477,7 @@ Provide a natural, conversational spoken response:"""
                     return None
                 
                 # Return base64 encoded audio
-                audio_base64 = base64.b64encode(response.content).decode('utf-8')
+                audio_base64 = _b64.b64encode(response.content).decode('ascii')
                 print(f"ElevenLabs TTS: Base64 encoded audio length: {len(audio_base64)}")
                 
                 return {
@@ -406,7 +504,6 @@ Provide a natural, conversational spoken response:"""
             return None
         except Exception as e:
             print(f"ElevenLabs TTS: Exception occurred: {type(e).__name__}: {str(e)}")
-            import traceback
             print(f"ElevenLabs TTS: Full traceback: {traceback.format_exc()}")
             return None
 
@@ -456,8 +553,12 @@ Provide a natural, conversational spoken response:"""
             if not api_key:
                 return self.get_fallback_response(message, contract_context)
             
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            cache_key = _response_cache_key('batch' if batch_mode else 'chat', message, contract_context)
+            cached = _response_cache_get(cache_key)
+            if cached is not None:
+                return cached
+            
+            model = _gemini_model(api_key)
             
             # Build comprehensive prompt
             system_prompt = self.build_system_prompt(contract_context, batch_mode)
@@ -470,7 +571,9 @@ User Question: {message}
 Please provide a helpful, accurate, and practical response:"""
 
             response = model.generate_content(full_prompt)
-            return response.text.strip()
+            answer = response.text.strip()
+            _response_cache_put(cache_key, answer)
+            return answer
             
         except Exception as e:
             print(f"Gemini error: {e}")
@@ -520,20 +623,8 @@ Guidelines:
 
     def classify_message_type(self, message):
         """Classify the type of legal question"""
-        message_lower = message.lower()
-        
-        if any(term in message_lower for term in ['risk', 'dangerous', 'problem', 'issue']):
-            return 'risk_assessment'
-        elif any(term in message_lower for term in ['termination', 'end', 'quit', 'fire']):
-            return 'termination'
-        elif any(term in message_lower for term in ['payment', 'salary', 'compensation', 'money']):
-            return 'compensation'
-        elif any(term in message_lower for term in ['confidential', 'nda', 'secret', 'proprietary']):
-            return 'confidentiality'
-        elif any(term in message_lower for term in ['negotiate', 'change', 'modify', 'improve']):
-            return 'negotiation'
-        else:
-            return 'general'
+        message_type = _first_topic(message, _MESSAGE_TYPE_RE, _MESSAGE_TYPE_KEYWORDS, _MESSAGE_TYPE_PRIORITY)
+        return message_type or 'general'
 
     def generate_suggestions(self, message, contract_context):
         """Generate contextual suggestions based on message and context"""
@@ -611,13 +702,12 @@ Guidelines:
         return base_response
 
     def do_GET(self):
-        self.send_response(405)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        
         error_response = {
             'error': 'Method not allowed. Use POST for chat.',
             'status': 'error'
         }
-        self.wfile.write(json.dumps(error_response).encode())
\ No newline at end of file
+        
+        self.send_response(405)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers_with_body(_dumps(error_response))
\ No newline at end of file
@@ -1,12 +1,43 @@
 import json
+import logging
 import os
-import tempfile
-import base64
-import google.generativeai as genai
+import re
+import hashlib
+import threading
+import time
+import zlib
+import gzip
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
 from http.server import BaseHTTPRequestHandler
-import cgi
+from urllib.parse import parse_qs, urlsplit
 import io
 
+# SIMD base64 for the MP3 payload, stdlib as fallback
+try:
+    import pybase64 as _b64
+except ImportError:
+    import base64 as _b64
+
+# orjson serializes straight to bytes (much faster on the large base64
+# audio strings) and parses bytes without a decode; stdlib json as fallback
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj).encode()
+    _loads = json.loads
+
+# Brotli for compressing large JSON responses, gzip as fallback
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
 # Load environment variables
 try:
     from dotenv import load_dotenv
@@ -14,139 +45,657 @@ try:
 except ImportError:
     pass  # dotenv not available in serverless environment
 
+# DEBUG-level tracing is skipped unless LOG_LEVEL asks for it; unknown
+# level names fall back to WARNING instead of failing the import. The
+# handler is attached to this module's logger only, leaving the root
+# logger to whatever the runtime configured.
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter('%(levelname)s %(name)s: %(message)s'))
+    logger.addHandler(_log_handler)
+    logger.propagate = False
+_log_level = logging.getLevelName(os.getenv('LOG_LEVEL', 'WARNING').upper())
+logger.setLevel(_log_level if isinstance(_log_level, int) else logging.WARNING)
+
 # Try to import ElevenLabs for TTS
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     ELEVENLABS_AVAILABLE = True
 except ImportError:
     ELEVENLABS_AVAILABLE = False
 
+# Shared session so warm instances reuse keep-alive TLS connections to
+# ElevenLabs and OpenAI instead of handshaking on every call
+if ELEVENLABS_AVAILABLE:
+    _HTTP_SESSION = requests.Session()
+    _HTTP_SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50))
+else:
+    _HTTP_SESSION = None
+
+# (connect, read) timeouts for ElevenLabs and Whisper calls. Vercel runs one
+# request per handler instance, so an unreachable upstream must fail fast
+# instead of holding the worker for the full read timeout.
+ELEVENLABS_TIMEOUT = (5, 30)
+WHISPER_TIMEOUT = (3, 30)
+ELEVENLABS_VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Rachel voice (professional female)
+ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"
+
+# Static parts of every TTS request, built once per process. The streaming
+# endpoint emits MP3 bytes while synthesizing.
+ELEVENLABS_TTS_URL = f"https://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}/stream?optimize_streaming_latency=3"
+_TTS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.5,
+    "style": 0.3,
+    "use_speaker_boost": True
+}
+
+@lru_cache(maxsize=4)
+def _tts_headers(api_key):
+    """ElevenLabs TTS request headers for api_key"""
+    return {
+        "Accept": "audio/mpeg",
+        "Content-Type": "application/json",
+        "xi-api-key": api_key
+    }
+
+# google.generativeai pulls in grpc and protobuf, so it is imported on the
+# first Gemini call rather than at cold start
+genai = None
+
+def _genai():
+    """Return the google.generativeai module, importing it on first use"""
+    global genai
+    if genai is None:
+        import google.generativeai as genai
+    return genai
+
+@lru_cache(maxsize=1)
+def _gemini_model(api_key):
+    """Configure Gemini for api_key and return the shared gemini-1.5-flash model.
+
+    Warm instances reuse the model; a changed key reconfigures.
+    """
+    _genai().configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-1.5-flash')
+
+# Per-call timeout in seconds for Gemini requests, so a stalled upstream
+# fails over to the next transcription option instead of holding the worker
+GEMINI_TIMEOUT = 30
+_GEMINI_REQUEST_OPTIONS = {'timeout': GEMINI_TIMEOUT}
+
+# Largest clip sent inline with the transcription request. Gemini caps a
+# whole request at 20 MB and inline data is base64-encoded on the wire.
+GEMINI_INLINE_AUDIO_LIMIT = 14 * 1024 * 1024
+
+# Enhanced transcription prompt with better instructions
+_TRANSCRIPTION_PROMPT = """Please transcribe this audio file with maximum accuracy. 
+                
+                CRITICAL INSTRUCTIONS:
+                - Transcribe EXACTLY what the speaker said word-for-word
+                - Do NOT interpret, summarize, or change the meaning
+                - If the audio is unclear, use [unclear] for that part
+                - Maintain natural speech patterns and filler words if present
+                - Output ONLY the transcribed text, no additional commentary
+                - Focus on accuracy over formality
+                
+                Transcription:"""
+
+# Voice-optimized prompt for answering a transcribed question
+_VOICE_PROMPT_TEMPLATE = """You are NyayMitra AI, a legal assistant. The user asked via voice: "{transcript}"
+
+Provide a conversational, voice-friendly response that:
+- Directly answers their question
+- Uses natural, spoken language (not written)
+- Keeps responses under 200 words for voice playback
+- Focuses on key points they need to know
+- Includes a brief disclaimer about consulting lawyers for binding advice
+
+Response:"""
+
+# Background workers for TTS so synthesis overlaps building the response
+_TTS_EXECUTOR = ThreadPoolExecutor(max_workers=4)
+
+_TTS_WARMED = False
+
+def _warm_tts_connection():
+    """Prime a pooled keep-alive connection to ElevenLabs in the background.
+
+    Runs once per process; later TTS calls reuse the pooled connection.
+    """
+    global _TTS_WARMED
+    if _TTS_WARMED or _HTTP_SESSION is None:
+        return
+    _TTS_WARMED = True
+
+    def warm():
+        try:
+            _HTTP_SESSION.head('https://api.elevenlabs.io', timeout=ELEVENLABS_TIMEOUT)
+        except Exception as e:
+            logger.debug("ElevenLabs connection warmup failed: %s", e)
+
+    _TTS_EXECUTOR.submit(warm)
+
+# In-flight TTS futures keyed by cache key, for coalescing duplicate requests
+_TTS_INFLIGHT = {}
+_TTS_INFLIGHT_LOCK = threading.Lock()
+
+def _tts_inflight_finished(key, future):
+    """Drop a completed TTS future from the in-flight table"""
+    with _TTS_INFLIGHT_LOCK:
+        if _TTS_INFLIGHT.get(key) is future:
+            del _TTS_INFLIGHT[key]
+
+# Optional Redis cache shared across serverless instances, so repeated TTS
+# audio, transcriptions and voice responses survive cold starts
+TTS_CACHE_TTL = 86400
+TRANSCRIPT_CACHE_TTL = 7 * 86400
+VOICE_RESPONSE_CACHE_TTL = 3600
+TTS_TEXT_TTL = 3600
+try:
+    import redis
+    _REDIS_CACHE = redis.Redis.from_url(os.environ['REDIS_URL']) if os.getenv('REDIS_URL') else None
+except ImportError:
+    _REDIS_CACHE = None
+
+class _LocalLRU:
+    """Small thread-safe LRU map for per-instance caching"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+# Per-instance LRUs in front of Redis: warm instances serve repeats without
+# a network round trip even when no REDIS_URL is set
+_TTS_LOCAL_CACHE = _LocalLRU(256)
+_TRANSCRIPT_LOCAL_CACHE = _LocalLRU(64)
+_VOICE_RESPONSE_LOCAL_CACHE = _LocalLRU(512)
+_TTS_TEXT_LOCAL_CACHE = _LocalLRU(512)
+
+def _redis_get(key):
+    """Return the Redis value for key, or None on miss/cache error"""
+    if _REDIS_CACHE is None:
+        return None
+    try:
+        return _REDIS_CACHE.get(key)
+    except Exception as e:
+        logger.warning("Cache: get failed: %s", e)
+        return None
+
+def _redis_set(key, value, ttl):
+    """Store value under key; cache errors never fail the request"""
+    if _REDIS_CACHE is None:
+        return
+    try:
+        _REDIS_CACHE.setex(key, ttl, value)
+    except Exception as e:
+        logger.warning("Cache: set failed: %s", e)
+
+def _tts_cache_get(key):
+    """Return cached raw MP3 bytes for key, or None on miss"""
+    audio = _TTS_LOCAL_CACHE.get(key)
+    if audio is None:
+        audio = _redis_get(key)
+        if audio:
+            _TTS_LOCAL_CACHE.put(key, audio)
+    return audio
+
+def _tts_cache_set(key, audio):
+    """Store raw MP3 bytes under key"""
+    _TTS_LOCAL_CACHE.put(key, audio)
+    _redis_set(key, audio, TTS_CACHE_TTL)
+
+def _transcript_cache_key(audio_data):
+    return f"stt:{hashlib.blake2b(audio_data, digest_size=16).hexdigest()}"
+
+def _transcript_cache_get(key):
+    """Return a cached transcription result dict for key, or None on miss"""
+    result = _TRANSCRIPT_LOCAL_CACHE.get(key)
+    if result is None:
+        cached = _redis_get(key)
+        if not cached:
+            return None
+        try:
+            result = _loads(cached)
+        except ValueError:
+            return None
+        _TRANSCRIPT_LOCAL_CACHE.put(key, result)
+    return dict(result)
+
+def _transcript_cache_set(key, result):
+    """Store a successful transcription result dict under key"""
+    _TRANSCRIPT_LOCAL_CACHE.put(key, dict(result))
+    _redis_set(key, _dumps(result), TRANSCRIPT_CACHE_TTL)
+
+def _voice_response_cache_key(transcript):
+    return f"voice:{hashlib.blake2b(transcript.encode(), digest_size=16).hexdigest()}"
+
+def _voice_response_cache_get(key):
+    """Return a cached Gemini voice response for key, or None on miss"""
+    voice_response = _VOICE_RESPONSE_LOCAL_CACHE.get(key)
+    if voice_response is None:
+        cached = _redis_get(key)
+        if not cached:
+            return None
+        voice_response = cached.decode()
+        _VOICE_RESPONSE_LOCAL_CACHE.put(key, voice_response)
+    return voice_response
+
+def _voice_response_cache_set(key, voice_response):
+    """Store a Gemini voice response under key"""
+    _VOICE_RESPONSE_LOCAL_CACHE.put(key, voice_response)
+    _redis_set(key, voice_response, VOICE_RESPONSE_CACHE_TTL)
+
+def _tts_text_get(token):
+    """Return the server-generated text registered under a TTS stream token, or None"""
+    entry = _TTS_TEXT_LOCAL_CACHE.get(token)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    cached = _redis_get(f"ttstext:{token}")
+    return cached.decode() if cached else None
+
+def _tts_text_set(token, text):
+    """Register text under token for TTS_TEXT_TTL seconds"""
+    _TTS_TEXT_LOCAL_CACHE.put(token, (time.monotonic() + TTS_TEXT_TTL, text))
+    _redis_set(f"ttstext:{token}", text, TTS_TEXT_TTL)
+
+# In-flight transcriptions keyed by audio hash. The first request for a clip
+# transcribes inline; concurrent duplicates wait on its future.
+TRANSCRIBE_COALESCE_TIMEOUT = 60
+_TRANSCRIBE_INFLIGHT = {}
+_TRANSCRIBE_INFLIGHT_LOCK = threading.Lock()
+
+# In-flight Gemini voice responses keyed by transcript hash, so a burst of the
+# same question costs one upstream call against the Gemini rate limit.
+_VOICE_RESPONSE_INFLIGHT = {}
+_VOICE_RESPONSE_INFLIGHT_LOCK = threading.Lock()
+
+def _b64encode_stream(response, chunk_size=3 * 65536, raw_chunks=None):
+    """Base64-encode a streamed response body without buffering it first.
+
+    Each chunk is encoded straight into one output buffer (pre-sized from
+    Content-Length when present), carrying any bytes that don't fill a
+    3-byte group over to the next chunk. Raw chunks are also appended to
+    raw_chunks when a list is given. Returns (base64_str, raw_size).
+    """
+    content_length = response.headers.get('Content-Length')
+    out = bytearray(((int(content_length) + 2) // 3) * 4) if content_length else bytearray()
+    pos = 0
+    size = 0
+    tail = b''
+    for chunk in response.iter_content(chunk_size):
+        size += len(chunk)
+        if raw_chunks is not None:
+            raw_chunks.append(chunk)
+        if tail:
+            chunk = tail + chunk
+        cut = len(chunk) - len(chunk) % 3
+        encoded = _b64.b64encode(memoryview(chunk)[:cut])
+        out[pos:pos + len(encoded)] = encoded
+        pos += len(encoded)
+        tail = chunk[cut:]
+    if tail:
+        encoded = _b64.b64encode(tail)
+        out[pos:pos + len(encoded)] = encoded
+        pos += len(encoded)
+    del out[pos:]
+    return out.decode('ascii'), size
+
+# Fallback-response keywords and the topic each one routes to. The
+# lookahead reports overlapping keywords too, so one scan finds every
+# keyword a substring check would.
+_FALLBACK_KEYWORD_TOPICS = {
+    'risk': 'risk',
+    'dangerous': 'risk',
+    'termination': 'termination',
+    'quit': 'termination',
+    'fire': 'termination',
+    'confidential': 'confidentiality',
+    'nda': 'confidentiality',
+    'intellectual property': 'ip',
+    'ip': 'ip',
+    'payment': 'payment',
+    'salary': 'payment',
+}
+_FALLBACK_KEYWORD_RE = re.compile('(?=(' + '|'.join(map(re.escape, _FALLBACK_KEYWORD_TOPICS)) + '))')
+
+# Canned fallback response per topic; when several topics match, the first
+# in _FALLBACK_TOPIC_PRIORITY wins
+_FALLBACK_TOPIC_PRIORITY = ('risk', 'termination', 'confidentiality', 'ip', 'payment')
+_FALLBACK_RESPONSES = {
+    'risk': "Great question about contract risks. Key areas to watch include termination terms, liability clauses, and intellectual property assignments. These can significantly impact your rights and obligations. I'd recommend having a lawyer review any concerning sections before signing.",
+    'termination': "Termination clauses are crucial to understand. Look for notice requirements, severance terms, and any post-employment restrictions. Most contracts require two to four weeks notice, but this varies. Make sure the terms are fair and reasonable for your situation.",
+    'confidentiality': "Confidentiality terms protect company information but shouldn't be overly broad. They should clearly define what's confidential and allow you to use general skills and knowledge in future roles. Be cautious of indefinite time periods or unclear scope.",
+    'ip': "Intellectual property clauses determine who owns work you create. Company ownership of work-related inventions is standard, but be careful of clauses claiming personal projects or pre-existing IP. Ensure the scope is reasonable and job-related.",
+    'payment': "Payment terms should be clear and protected. Look for guaranteed amounts, payment schedules, and expense policies. Ensure any performance-based pay has objective criteria. You should also understand overtime policies and benefit contributions.",
+}
+
+# Simulated transcripts picked by audio length in bytes: the entry at
+# bisect_right(lengths, audio_length), i.e. the first bucket whose upper
+# bound exceeds the length
+_DEMO_TRANSCRIPT_LENGTHS = (2000, 5000, 10000)
+_DEMO_TRANSCRIPTS = (
+    "Tell me about some legal laws",
+    "Can you explain the main legal concepts I should know about?",
+    "What are the important legal principles for contract analysis?",
+    "Give me a comprehensive overview of legal laws and regulations I should be aware of.",
+)
+
+_SIMULATED_TRANSCRIPT_LENGTHS = (1000, 5000, 10000)
+_SIMULATED_TRANSCRIPTS = (
+    "What are the key risks in this contract?",
+    "Can you explain the termination clause in my employment agreement?",
+    "I'm concerned about the confidentiality terms. Are they too broad?",
+    "Please review the intellectual property section and tell me if there are any issues I should be aware of.",
+)
+
+# Same scheme for simulate_transcription_fallback, with a bucket of
+# candidate transcripts per length range
+_FALLBACK_TRANSCRIPT_LENGTHS = (2000, 5000, 10000)
+_FALLBACK_TRANSCRIPTS = (
+    (
+        "What are the main risks in this contract?",
+        "Can you explain the termination clause?",
+        "Is this confidentiality agreement too broad?",
+        "What should I know about the payment terms?"
+    ),
+    (
+        "I'm concerned about the intellectual property section. Can you review it?",
+        "The termination clause seems unfair. What are my options?",
+        "Can you explain what this confidentiality agreement means?",
+        "Are there any red flags in the compensation section?"
+    ),
+    (
+        "I need help understanding the non-compete clause. It seems very restrictive.",
+        "The contract has a lot of legal jargon. Can you break down the key risks?",
+        "I'm worried about the liability section. What am I agreeing to?",
+        "Can you review the intellectual property terms and tell me if they're standard?"
+    ),
+    (
+        "This is a complex employment contract and I need help understanding all the terms. Can you analyze the risks?",
+        "I'm reviewing this service agreement and there are several clauses I don't understand. Can you help?",
+        "The contract has multiple sections about confidentiality and non-compete. Are these terms reasonable?",
+        "I need a comprehensive review of this contract to understand what I'm agreeing to before I sign."
+    ),
+)
+
+def _read_body(rfile, length):
+    """Read up to length request-body bytes into one preallocated buffer"""
+    body = bytearray(length)
+    with memoryview(body) as view:
+        received = 0
+        while received < length:
+            n = rfile.readinto(view[received:])
+            if not n:
+                break
+            received += n
+    if received < length:
+        del body[received:]
+    return body
+
+# Multipart upload parsing: boundary parameter of the Content-Type, and the
+# part headers that mark the audio field
+_MULTIPART_BOUNDARY_RE = re.compile(r'boundary=(?:"([^"]+)"|([^;\s]+))', re.I)
+_MULTIPART_AUDIO_PART_RE = re.compile(rb'content-disposition:[^\r\n]*;\s*name="?audio"?(?:[;\s]|$)', re.I | re.M)
+
+# JSON bodies below this size are not worth compressing
+COMPRESS_MIN_SIZE = 1024
+
+# Static 405 body for GET, serialized once
+_GET_NOT_ALLOWED_BODY = _dumps({
+    'error': 'Method not allowed. Use POST for audio transcription.',
+    'status': 'error'
+})
+
+# Fixed error bodies for rejected POSTs, likewise serialized at import
+_NO_AUDIO_BODY = _dumps({'error': 'No audio file provided', 'status': 'error'})
+_INVALID_JSON_BODY = _dumps({'error': 'Invalid JSON', 'status': 'error'})
+_NO_DATA_BODY = _dumps({'error': 'No data provided', 'status': 'error'})
+_TTS_UNAVAILABLE_BODY = _dumps({
+    'error': 'Text-to-speech unavailable',
+    'status': 'error',
+    'tts_status': 'elevenlabs_failed'
+})
+
+# Audio is only synthesized for text this endpoint generated itself, named
+# by the token in tts_stream_url; client-supplied text is refused
+_TTS_TOKEN_INVALID_BODY = _dumps({
+    'error': 'Unknown or expired tts_token',
+    'status': 'error'
+})
+_TTS_TEXT_REJECTED_BODY = _dumps({
+    'error': 'tts_text is not accepted; POST to the tts_stream_url of a voice response',
+    'status': 'error'
+})
+
 class handler(BaseHTTPRequestHandler):
+    # Set per request when the client sends "Accept: audio/mpeg": responses
+    # then carry a tts_stream_url instead of embedded base64 audio
+    stream_tts = False
+
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.send_cors_response(200)
         self.end_headers()
 
     def do_POST(self):
         try:
-            # Handle CORS
-            self.send_response(200)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
-            self.send_header('Content-Type', 'application/json')
-            self.end_headers()
+            self.stream_tts = 'audio/mpeg' in self.headers.get('Accept', '')
             
-            # Parse multipart form data for audio file
+            # Look up the request headers once; both branches need them
             content_type = self.headers.get('Content-Type', '')
+            content_length = int(self.headers.get('Content-Length') or 0)
+            
+            # Error branches set a prebuilt body; otherwise result is serialized
+            body = None
+            
+            # Parse multipart form data for audio file
             if content_type.startswith('multipart/form-data'):
                 # Parse form data with audio file
-                form = cgi.FieldStorage(
-                    fp=self.rfile,
-                    headers=self.headers,
-                    environ={'REQUEST_METHOD': 'POST'}
-                )
+                audio_data = self.read_multipart_audio(content_type, content_length)
                 
-                if 'audio' in form:
-                    audio_file = form['audio']
-                    audio_data = audio_file.file.read()
-                    
+                if audio_data:
                     # Process audio transcription
                     result = self.transcribe_audio(audio_data)
-                    self.wfile.write(json.dumps(result).encode())
                 else:
-                    error_response = {
-                        'error': 'No audio file provided',
-                        'status': 'error'
-                    }
-                    self.wfile.write(json.dumps(error_response).encode())
+                    body = _NO_AUDIO_BODY
             else:
+                tts_token = parse_qs(urlsplit(self.path).query).get('tts_token')
+                if tts_token:
+                    # Audio-only request: stream the MP3 straight through
+                    tts_text = _tts_text_get(tts_token[0])
+                    if tts_text is None:
+                        body = _TTS_TOKEN_INVALID_BODY
+                    elif self.stream_speech_with_elevenlabs(tts_text):
+                        return
+                    else:
+                        body = _TTS_UNAVAILABLE_BODY
                 # Handle JSON request (for demo/testing)
-                content_length = int(self.headers.get('Content-Length', 0))
-                if content_length > 0:
-                    body = self.rfile.read(content_length).decode('utf-8')
+                elif content_length > 0:
+                    request_body = _read_body(self.rfile, content_length)
                     try:
-                        data = json.loads(body)
-                        # Demo transcription
-                        demo_transcript = data.get('demo_text', 'Hello, this is a test voice message about contract terms.')
-                        result = self.generate_voice_response(demo_transcript)
-                        self.wfile.write(json.dumps(result).encode())
+                        data = _loads(request_body)
+                        if 'tts_text' in data:
+                            body = _TTS_TEXT_REJECTED_BODY
+                        else:
+                            # Demo transcription
+                            demo_transcript = data.get('demo_text', 'Hello, this is a test voice message about contract terms.')
+                            result = self.generate_voice_response(demo_transcript)
                     except:
-                        error_response = {'error': 'Invalid JSON', 'status': 'error'}
-                        self.wfile.write(json.dumps(error_response).encode())
+                        body = _INVALID_JSON_BODY
                 else:
-                    error_response = {'error': 'No data provided', 'status': 'error'}
-                    self.wfile.write(json.dumps(error_response).encode())
+                    body = _NO_DATA_BODY
+            
+            if body is None:
+                body = _dumps(result)
+            self.send_json(200, body)
                 
         except Exception as e:
             try:
-                self.send_response(500)
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Content-Type', 'application/json')
-                self.end_headers()
-                
                 error_response = {
                     'error': f'Transcription error: {str(e)}',
                     'status': 'error'
                 }
                 
-                print(f"Transcription error: {str(e)}")
-                self.wfile.write(json.dumps(error_response).encode())
+                logger.error("Transcription error: %s", e)
+                self.send_json(500, _dumps(error_response))
             except:
                 pass
 
+    def read_multipart_audio(self, content_type, content_length):
+        """Return the 'audio' part of a multipart body, or None if absent.
+
+        The body is scanned for boundaries in place and the audio comes
+        back as a memoryview slice of it, so nothing is copied.
+        """
+        match = _MULTIPART_BOUNDARY_RE.search(content_type)
+        if not match:
+            return None
+        delimiter = b'--' + (match.group(1) or match.group(2)).encode('latin-1')
+        
+        body = _read_body(self.rfile, content_length)
+        pos = body.find(delimiter)
+        while pos != -1:
+            start = pos + len(delimiter)
+            if body.startswith(b'--', start):
+                break  # closing delimiter
+            header_end = body.find(b'\r\n\r\n', start)
+            if header_end == -1:
+                break
+            end = body.find(b'\r\n' + delimiter, header_end + 4)
+            if end == -1:
+                break
+            if _MULTIPART_AUDIO_PART_RE.search(body, start, header_end):
+                return memoryview(body)[header_end + 4:end]
+            pos = end + 2
+        return None
+
     def transcribe_audio(self, audio_data):
+        """Transcribe audio, serving repeats from cache and coalescing duplicates.
+
+        Identical uploads (retries, shared demo clips) skip transcription, the
+        voice response and TTS entirely. Concurrent identical uploads wait on
+        the first one's result instead of calling Gemini/Whisper again.
+        """
+        cache_key = _transcript_cache_key(audio_data)
+        if self.stream_tts:
+            cache_key += ':stream'
+        cached_result = _transcript_cache_get(cache_key)
+        if cached_result is not None:
+            logger.debug("Transcription cache hit for %s", cache_key)
+            if 'tts_stream_url' in cached_result:
+                # The cached result outlives its stream token; register it again
+                cached_result.update(self.start_speech_generation(cached_result['ai_response']).result())
+            return cached_result
+        
+        with _TRANSCRIBE_INFLIGHT_LOCK:
+            future = _TRANSCRIBE_INFLIGHT.get(cache_key)
+            leader = future is None
+            if leader:
+                future = _TRANSCRIBE_INFLIGHT[cache_key] = Future()
+        
+        if not leader:
+            try:
+                logger.debug("Transcription in flight for %s, waiting", cache_key)
+                return dict(future.result(timeout=TRANSCRIBE_COALESCE_TIMEOUT))
+            except Exception as e:
+                logger.warning("Coalesced transcription failed (%s), transcribing directly", e)
+                return self.transcribe_with_fallbacks(audio_data, cache_key)
+        
+        try:
+            result = self.transcribe_with_fallbacks(audio_data, cache_key)
+            future.set_result(dict(result))
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _TRANSCRIBE_INFLIGHT_LOCK:
+                del _TRANSCRIBE_INFLIGHT[cache_key]
+
+    def is_cacheable_transcription(self, result):
+        """Return True if result may be cached for TRANSCRIPT_CACHE_TTL.
+
+        Only results with TTS audio (or a stream URL) and a Gemini answer,
+        not a canned fallback, qualify, so a brief ElevenLabs or Gemini
+        outage does not pin a degraded reply to the clip for a week.
+        """
+        if 'tts_status' in result:
+            return False
+        if 'audio_data' not in result and 'tts_stream_url' not in result:
+            return False
+        return result.get('ai_response') != self.get_fallback_voice_response(result.get('transcript', ''))
+
+    def transcribe_with_fallbacks(self, audio_data, cache_key):
         """Transcribe audio using available services with intelligent fallbacks"""
         try:
-            print(f"Starting audio transcription, audio size: {len(audio_data)} bytes")
-            print(f"Available API keys check:")
-            print(f"  - ELEVEN_API_KEY: {'Yes' if os.getenv('ELEVEN_API_KEY') else 'No'}")
-            print(f"  - ELEVENLABS_API_KEY: {'Yes' if os.getenv('ELEVENLABS_API_KEY') else 'No'}")
-            print(f"  - GEMINI_API_KEY: {'Yes' if os.getenv('GEMINI_API_KEY') else 'No'}")
-            print(f"  - OPENAI_API_KEY: {'Yes' if os.getenv('OPENAI_API_KEY') else 'No'}")
+            logger.debug("Starting audio transcription, audio size: %s bytes", len(audio_data))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Available API keys: %s",
+                    {name: bool(os.getenv(name)) for name in ('ELEVEN_API_KEY', 'ELEVENLABS_API_KEY', 'GEMINI_API_KEY', 'OPENAI_API_KEY')}
+                )
             
             # Note: Browser-based Web Speech API is now the primary transcription method
             # This backend transcription is kept as fallback only for non-browser uploads
-            print("Backend transcription fallback - browser transcription is preferred")
+            logger.debug("Backend transcription fallback - browser transcription is preferred")
             
             # Option 1: Try Google Gemini Audio API
             api_key = os.getenv('GEMINI_API_KEY')
             if api_key:
                 try:
-                    print("Attempting Gemini audio transcription...")
+                    logger.debug("Attempting Gemini audio transcription...")
                     result = self.transcribe_with_gemini(audio_data, api_key)
                     # Only return if successful, otherwise continue to next option
                     if result.get('status') == 'success' and result.get('method') == 'gemini':
-                        print("Gemini transcription successful!")
+                        logger.debug("Gemini transcription successful!")
+                        if self.is_cacheable_transcription(result):
+                            _transcript_cache_set(cache_key, result)
                         return result
                     else:
-                        print("Gemini transcription failed, trying next option...")
+                        logger.warning("Gemini transcription failed, trying next option...")
                 except Exception as gemini_error:
-                    print(f"Gemini transcription failed with error: {gemini_error}")
+                    logger.warning("Gemini transcription failed with error: %s", gemini_error)
                     # Continue to next option instead of returning error
             else:
-                print("Gemini API key not found, skipping Gemini transcription")
+                logger.debug("Gemini API key not found, skipping Gemini transcription")
             
             # Option 2: Try OpenAI Whisper API
             openai_key = os.getenv('OPENAI_API_KEY')
             if openai_key:
                 try:
-                    print("Attempting OpenAI Whisper transcription...")
+                    logger.debug("Attempting OpenAI Whisper transcription...")
                     result = self.transcribe_with_whisper(audio_data, openai_key)
                     if result.get('status') == 'success':
-                        print("Whisper transcription successful!")
+                        logger.debug("Whisper transcription successful!")
+                        if self.is_cacheable_transcription(result):
+                            _transcript_cache_set(cache_key, result)
                         return result
                     else:
-                        print("Whisper transcription failed, trying next option...")
+                        logger.warning("Whisper transcription failed, trying next option...")
                 except Exception as whisper_error:
-                    print(f"Whisper transcription failed: {whisper_error}")
+                    logger.warning("Whisper transcription failed: %s", whisper_error)
             else:
-                print("OpenAI API key not found, skipping Whisper transcription")
+                logger.debug("OpenAI API key not found, skipping Whisper transcription")
             
             # Option 3: Temporary fallback for testing with debugging info
-            print("All transcription services failed - using temporary simulation with debug info")
+            logger.warning("All transcription services failed - using temporary simulation with debug info")
             result = self.simulate_transcription_with_explanation(audio_data)
             result['debug_info'] = {
                 'elevenlabs_api_available': bool(os.getenv('ELEVEN_API_KEY') or os.getenv('ELEVENLABS_API_KEY')),
@@ -158,7 +707,7 @@ class handler(BaseHTTPRequestHandler):
             return result
             
         except Exception as e:
-            print(f"Audio transcription error: {e}")
+            logger.error("Audio transcription error: %s", e)
             return {
                 'error': f'Audio processing failed: {str(e)}',
                 'status': 'error',
@@ -171,14 +720,7 @@ class handler(BaseHTTPRequestHandler):
         audio_length = len(audio_data)
         
         # Generate more realistic simulated transcripts based on common user queries
-        if audio_length < 2000:
-            simulated_transcript = "Tell me about some legal laws"
-        elif audio_length < 5000:
-            simulated_transcript = "Can you explain the main legal concepts I should know about?"
-        elif audio_length < 10000:
-            simulated_transcript = "What are the important legal principles for contract analysis?"
-        else:
-            simulated_transcript = "Give me a comprehensive overview of legal laws and regulations I should be aware of."
+        simulated_transcript = _DEMO_TRANSCRIPTS[bisect_right(_DEMO_TRANSCRIPT_LENGTHS, audio_length)]
         
         # Generate AI response
         ai_response = self.generate_voice_response(simulated_transcript)
@@ -187,8 +729,8 @@ class handler(BaseHTTPRequestHandler):
         demo_explanation = " Note: This is currently using simulated transcription while we debug the audio processing service. Your actual speech will be transcribed once the service is fully operational."
         ai_response += demo_explanation
         
-        # Generate TTS audio for the AI response
-        tts_audio = self.generate_speech_with_elevenlabs(ai_response)
+        # Start TTS audio for the AI response in the background
+        tts_future = self.start_speech_generation(ai_response)
         
         response_data = {
             'transcript': simulated_transcript,
@@ -202,70 +744,54 @@ class handler(BaseHTTPRequestHandler):
         }
         
         # Add TTS audio if available
+        tts_audio = tts_future.result()
         if tts_audio:
-            print("Demo mode: TTS audio generated successfully")
+            logger.debug("Demo mode: TTS audio generated successfully")
             response_data.update(tts_audio)
         else:
-            print("Demo mode: TTS audio generation failed, browser fallback will be used")
+            logger.warning("Demo mode: TTS audio generation failed, browser fallback will be used")
         
         return response_data
 
     def transcribe_with_gemini(self, audio_data, api_key):
         """Transcribe audio using Google Gemini Audio API"""
         try:
-            print(f"Gemini transcription: Starting with API key: {api_key[:8]}...")
-            genai.configure(api_key=api_key)
-            
-            # Save audio data to temporary file for Gemini processing
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_audio:
-                temp_audio.write(audio_data)
-                temp_audio_path = temp_audio.name
+            logger.debug("Gemini transcription: Starting with API key: %s...", api_key[:8])
+            model = _gemini_model(api_key)
             
-            print(f"Gemini transcription: Audio saved to {temp_audio_path}, size: {os.path.getsize(temp_audio_path)} bytes")
+            # Open the ElevenLabs connection while Gemini works, so the TTS
+            # call at the end skips the TCP/TLS handshake
+            _warm_tts_connection()
             
             try:
-                # Upload audio file to Gemini
-                print("Gemini transcription: Uploading audio file to Gemini...")
-                audio_file = genai.upload_file(temp_audio_path)
-                print(f"Gemini transcription: Upload successful - {audio_file.name}")
-                
-                # Use Gemini 1.5 Flash for audio transcription
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                
-                # Enhanced transcription prompt with better instructions
-                transcription_prompt = """Please transcribe this audio file with maximum accuracy. 
-                
-                CRITICAL INSTRUCTIONS:
-                - Transcribe EXACTLY what the speaker said word-for-word
-                - Do NOT interpret, summarize, or change the meaning
-                - If the audio is unclear, use [unclear] for that part
-                - Maintain natural speech patterns and filler words if present
-                - Output ONLY the transcribed text, no additional commentary
-                - Focus on accuracy over formality
-                
-                Transcription:"""
+                if len(audio_data) <= GEMINI_INLINE_AUDIO_LIMIT:
+                    # Small clips go inline with the prompt, skipping the upload round trip
+                    logger.debug("Gemini transcription: Sending %s bytes of audio inline", len(audio_data))
+                    audio_file = {'mime_type': 'audio/webm', 'data': bytes(audio_data)}
+                else:
+                    # Upload audio straight from memory to Gemini
+                    logger.debug("Gemini transcription: Uploading %s bytes of audio to Gemini...", len(audio_data))
+                    audio_file = _genai().upload_file(io.BytesIO(audio_data), mime_type='audio/webm')
+                    logger.debug("Gemini transcription: Upload successful - %s", audio_file.name)
                 
                 # Generate transcription
-                print("Gemini transcription: Generating transcription...")
-                response = model.generate_content([transcription_prompt, audio_file])
+                logger.debug("Gemini transcription: Generating transcription...")
+                response = model.generate_content([_TRANSCRIPTION_PROMPT, audio_file], request_options=_GEMINI_REQUEST_OPTIONS)
                 transcript = response.text.strip()
                 
                 # Clean up the transcript (remove any extra formatting)
                 if transcript.startswith('"') and transcript.endswith('"'):
                     transcript = transcript[1:-1]
                 
-                print(f"Gemini transcription: Raw response: {transcript}")
-                print(f"Gemini transcription: Cleaned transcript: {transcript}")
-                
-                # Clean up temp file
-                os.unlink(temp_audio_path)
+                logger.debug("Gemini transcription: Raw response: %s", transcript)
+                logger.debug("Gemini transcription: Cleaned transcript: %s", transcript)
                 
                 # Generate AI response to the transcribed text
                 ai_response = self.generate_voice_response(transcript)
                 
-                # Generate TTS audio for the AI response
-                print(f"Gemini transcription: Attempting ElevenLabs TTS...")
-                tts_audio = self.generate_speech_with_elevenlabs(ai_response)
+                # Start TTS audio for the AI response in the background
+                logger.debug("Gemini transcription: Attempting ElevenLabs TTS...")
+                tts_future = self.start_speech_generation(ai_response)
                 
                 response_data = {
                     'transcript': transcript,
@@ -276,79 +802,47 @@ class handler(BaseHTTPRequestHandler):
                 }
                 
                 # Add TTS audio if available
+                tts_audio = tts_future.result()
                 if tts_audio:
-                    print("Gemini transcription: ElevenLabs TTS audio generated successfully")
+                    logger.debug("Gemini transcription: ElevenLabs TTS audio generated successfully")
                     response_data.update(tts_audio)
                 else:
-                    print("Gemini transcription: ElevenLabs TTS failed, browser fallback will be used")
+                    logger.warning("Gemini transcription: ElevenLabs TTS failed, browser fallback will be used")
                     response_data['tts_status'] = 'elevenlabs_failed'
                 
                 return response_data
                 
             except Exception as gemini_error:
-                # Clean up temp file on error
-                if os.path.exists(temp_audio_path):
-                    os.unlink(temp_audio_path)
-                    
-                print(f"Gemini transcription: Audio processing error: {gemini_error}")
-                print(f"Gemini transcription: Error type: {type(gemini_error).__name__}")
+                logger.warning("Gemini transcription: Audio processing error: %s", gemini_error)
+                logger.warning("Gemini transcription: Error type: %s", type(gemini_error).__name__)
                 
                 # Return error details instead of falling back
                 raise Exception(f"Gemini audio API error: {str(gemini_error)}")
                 
         except Exception as e:
-            print(f"Gemini transcription: Setup error: {e}")
-            print(f"Gemini transcription: Error type: {type(e).__name__}")
+            logger.warning("Gemini transcription: Setup error: %s", e)
+            logger.warning("Gemini transcription: Error type: %s", type(e).__name__)
             raise Exception(f"Gemini transcription failed: {str(e)}")
 
     def simulate_transcription_fallback(self, audio_data, error_reason):
         """Enhanced simulation fallback when Gemini audio fails"""
-        print(f"Using simulation fallback due to: {error_reason}")
+        logger.debug("Using simulation fallback due to: %s", error_reason)
         
         # Analyze audio characteristics for realistic simulation
         audio_length = len(audio_data)
         
-        # Generate contextual simulated transcripts based on audio length
-        if audio_length < 2000:
-            transcripts = [
-                "What are the main risks in this contract?",
-                "Can you explain the termination clause?",
-                "Is this confidentiality agreement too broad?",
-                "What should I know about the payment terms?"
-            ]
-        elif audio_length < 5000:
-            transcripts = [
-                "I'm concerned about the intellectual property section. Can you review it?",
-                "The termination clause seems unfair. What are my options?",
-                "Can you explain what this confidentiality agreement means?",
-                "Are there any red flags in the compensation section?"
-            ]
-        elif audio_length < 10000:
-            transcripts = [
-                "I need help understanding the non-compete clause. It seems very restrictive.",
-                "The contract has a lot of legal jargon. Can you break down the key risks?",
-                "I'm worried about the liability section. What am I agreeing to?",
-                "Can you review the intellectual property terms and tell me if they're standard?"
-            ]
-        else:
-            transcripts = [
-                "This is a complex employment contract and I need help understanding all the terms. Can you analyze the risks?",
-                "I'm reviewing this service agreement and there are several clauses I don't understand. Can you help?",
-                "The contract has multiple sections about confidentiality and non-compete. Are these terms reasonable?",
-                "I need a comprehensive review of this contract to understand what I'm agreeing to before I sign."
-            ]
+        # Pick the bucket of contextual transcripts for the audio length
+        transcripts = _FALLBACK_TRANSCRIPTS[bisect_right(_FALLBACK_TRANSCRIPT_LENGTHS, audio_length)]
         
-        # Select transcript based on audio data hash for consistency
-        import hashlib
-        audio_hash = hashlib.md5(audio_data[:100]).hexdigest()
-        transcript_index = int(audio_hash[:2], 16) % len(transcripts)
+        # Select transcript based on a checksum of the audio for consistency
+        transcript_index = zlib.crc32(audio_data[:100]) % len(transcripts)
         simulated_transcript = transcripts[transcript_index]
         
         # Generate AI response
         ai_response = self.generate_voice_response(simulated_transcript)
         
-        # Generate TTS audio for the AI response
-        tts_audio = self.generate_speech_with_elevenlabs(ai_response)
+        # Start TTS audio for the AI response in the background
+        tts_future = self.start_speech_generation(ai_response)
         
         response_data = {
             'transcript': simulated_transcript,
@@ -361,6 +855,7 @@ class handler(BaseHTTPRequestHandler):
         }
         
         # Add TTS audio if available
+        tts_audio = tts_future.result()
         if tts_audio:
             response_data.update(tts_audio)
         
@@ -369,143 +864,121 @@ class handler(BaseHTTPRequestHandler):
     def transcribe_with_elevenlabs(self, audio_data, api_key):
         """Transcribe audio using ElevenLabs Speech-to-Text API"""
         try:
-            print(f"ElevenLabs STT: Starting transcription with API key: {api_key[:8]}...")
+            logger.debug("ElevenLabs STT: Starting transcription with API key: %s...", api_key[:8])
             
             if not ELEVENLABS_AVAILABLE:
-                print("ElevenLabs STT: requests module not available")
+                logger.warning("ElevenLabs STT: requests module not available")
                 raise Exception("Requests module not available for ElevenLabs API")
             
-            # Save audio data to temporary file - try multiple formats
-            temp_audio_path = None
-            try:
-                # Try saving as MP3 first (more widely supported)
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_audio:
-                    temp_audio.write(audio_data)
-                    temp_audio_path = temp_audio.name
-                
-                print(f"ElevenLabs STT: Audio saved to {temp_audio_path}, size: {os.path.getsize(temp_audio_path)} bytes")
-                
-                # ElevenLabs Speech-to-Text API endpoint - check if this is correct
-                url = "https://api.elevenlabs.io/v1/speech-to-text"
-                
-                headers = {
-                    "xi-api-key": api_key,
-                    "accept": "application/json"
-                }
-                
-                # Prepare the file for upload
-                with open(temp_audio_path, 'rb') as audio_file:
-                    files = {
-                        'audio': ('recording.mp3', audio_file, 'audio/mpeg')
-                    }
+            logger.debug("ElevenLabs STT: Audio size: %s bytes", len(audio_data))
+            
+            # ElevenLabs Speech-to-Text API endpoint - check if this is correct
+            url = "https://api.elevenlabs.io/v1/speech-to-text"
+            
+            headers = {
+                "xi-api-key": api_key,
+                "accept": "application/json"
+            }
+            
+            # Upload the audio straight from memory
+            files = {
+                'audio': ('recording.mp3', io.BytesIO(audio_data), 'audio/mpeg')
+            }
+            
+            # Simplified parameters - remove potentially unsupported ones
+            data = {
+                'language': 'en'  # Just specify language
+            }
+            
+            logger.debug("ElevenLabs STT: Making API request...")
+            logger.debug("ElevenLabs STT: URL: %s", url)
+            logger.debug("ElevenLabs STT: Headers: %s", headers)
+            logger.debug("ElevenLabs STT: Data: %s", data)
+            
+            response = _HTTP_SESSION.post(url, headers=headers, files=files, data=data, timeout=ELEVENLABS_TIMEOUT)
+            
+            logger.debug("ElevenLabs STT: Response status: %s", response.status_code)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("ElevenLabs STT: Response headers: %s", dict(response.headers))
+                logger.debug("ElevenLabs STT: Response text: %s...", response.text[:500])
+            
+            if response.status_code == 200:
+                try:
+                    result = response.json()
+                    logger.debug("ElevenLabs STT: JSON response: %s", result)
                     
-                    # Simplified parameters - remove potentially unsupported ones
-                    data = {
-                        'language': 'en'  # Just specify language
+                    transcript = result.get('text', '').strip()
+                    
+                    if not transcript:
+                        logger.debug("ElevenLabs STT: Empty transcript in response")
+                        raise Exception("Empty transcript received from ElevenLabs STT")
+                    
+                    logger.debug("ElevenLabs STT: Successfully transcribed: '%s'", transcript)
+                    
+                    # Generate AI response to the transcribed text
+                    ai_response = self.generate_voice_response(transcript)
+                    
+                    # Start TTS audio for the AI response in the background
+                    logger.debug("ElevenLabs STT: Attempting ElevenLabs TTS for response...")
+                    tts_future = self.start_speech_generation(ai_response)
+                    
+                    response_data = {
+                        'transcript': transcript,
+                        'ai_response': ai_response,
+                        'confidence': result.get('confidence', 0.95),
+                        'status': 'success',
+                        'method': 'elevenlabs_stt'
                     }
                     
-                    print("ElevenLabs STT: Making API request...")
-                    print(f"ElevenLabs STT: URL: {url}")
-                    print(f"ElevenLabs STT: Headers: {headers}")
-                    print(f"ElevenLabs STT: Data: {data}")
+                    # Add TTS audio if available
+                    tts_audio = tts_future.result()
+                    if tts_audio:
+                        logger.debug("ElevenLabs STT: ElevenLabs TTS audio generated successfully")
+                        response_data.update(tts_audio)
+                    else:
+                        logger.warning("ElevenLabs STT: ElevenLabs TTS failed, browser fallback will be used")
+                        response_data['tts_status'] = 'elevenlabs_failed'
                     
-                    response = requests.post(url, headers=headers, files=files, data=data, timeout=30)
-                
-                print(f"ElevenLabs STT: Response status: {response.status_code}")
-                print(f"ElevenLabs STT: Response headers: {dict(response.headers)}")
-                print(f"ElevenLabs STT: Response text: {response.text[:500]}...")
-                
-                if response.status_code == 200:
-                    try:
-                        result = response.json()
-                        print(f"ElevenLabs STT: JSON response: {result}")
-                        
-                        transcript = result.get('text', '').strip()
-                        
-                        if not transcript:
-                            print("ElevenLabs STT: Empty transcript in response")
-                            raise Exception("Empty transcript received from ElevenLabs STT")
-                        
-                        print(f"ElevenLabs STT: Successfully transcribed: '{transcript}'")
-                        
-                        # Generate AI response to the transcribed text
-                        ai_response = self.generate_voice_response(transcript)
-                        
-                        # Generate TTS audio for the AI response
-                        print(f"ElevenLabs STT: Attempting ElevenLabs TTS for response...")
-                        tts_audio = self.generate_speech_with_elevenlabs(ai_response)
-                        
-                        response_data = {
-                            'transcript': transcript,
-                            'ai_response': ai_response,
-                            'confidence': result.get('confidence', 0.95),
-                            'status': 'success',
-                            'method': 'elevenlabs_stt'
-                        }
-                        
-                        # Add TTS audio if available
-                        if tts_audio:
-                            print("ElevenLabs STT: ElevenLabs TTS audio generated successfully")
-                            response_data.update(tts_audio)
-                        else:
-                            print("ElevenLabs STT: ElevenLabs TTS failed, browser fallback will be used")
-                            response_data['tts_status'] = 'elevenlabs_failed'
-                        
-                        return response_data
-                        
-                    except json.JSONDecodeError as json_error:
-                        print(f"ElevenLabs STT: JSON decode error: {json_error}")
-                        print(f"ElevenLabs STT: Raw response: {response.text}")
-                        raise Exception(f"Invalid JSON response from ElevenLabs STT: {json_error}")
-                        
-                elif response.status_code == 401:
-                    print("ElevenLabs STT: Authentication failed - check API key")
-                    raise Exception("ElevenLabs STT authentication failed - invalid API key")
-                elif response.status_code == 404:
-                    print("ElevenLabs STT: Endpoint not found - API might have changed")
-                    raise Exception("ElevenLabs STT endpoint not found - API might have changed")
-                else:
-                    error_text = response.text
-                    print(f"ElevenLabs STT: API error {response.status_code}: {error_text}")
-                    raise Exception(f"ElevenLabs STT API error: {response.status_code} - {error_text}")
+                    return response_data
                     
-            finally:
-                # Clean up temp file
-                if temp_audio_path and os.path.exists(temp_audio_path):
-                    os.unlink(temp_audio_path)
-                    print("ElevenLabs STT: Cleaned up temporary file")
+                except json.JSONDecodeError as json_error:
+                    logger.warning("ElevenLabs STT: JSON decode error: %s", json_error)
+                    logger.debug("ElevenLabs STT: Raw response: %s", response.text)
+                    raise Exception(f"Invalid JSON response from ElevenLabs STT: {json_error}")
                     
+            elif response.status_code == 401:
+                logger.warning("ElevenLabs STT: Authentication failed - check API key")
+                raise Exception("ElevenLabs STT authentication failed - invalid API key")
+            elif response.status_code == 404:
+                logger.warning("ElevenLabs STT: Endpoint not found - API might have changed")
+                raise Exception("ElevenLabs STT endpoint not found - API might have changed")
+            else:
+                error_text = response.text
+                logger.warning("ElevenLabs STT: API error %s: %s", response.status_code, error_text)
+                raise Exception(f"ElevenLabs STT API error: {response.status_code} - {error_text}")
+                
         except Exception as e:
-            print(f"ElevenLabs STT: Error occurred: {type(e).__name__}: {str(e)}")
-            import traceback
-            print(f"ElevenLabs STT: Full traceback: {traceback.format_exc()}")
+            logger.exception("ElevenLabs STT: Error occurred: %s: %s", type(e).__name__, e)
             raise Exception(f"ElevenLabs STT failed: {str(e)}")
 
     def transcribe_with_whisper(self, audio_data, api_key):
         """Transcribe using OpenAI Whisper API"""
         try:
-            import requests
-            
-            # Save audio data to temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-                temp_audio.write(audio_data)
-                temp_audio_path = temp_audio.name
-            
-            # Send to OpenAI Whisper API
-            with open(temp_audio_path, 'rb') as audio_file:
-                response = requests.post(
-                    'https://api.openai.com/v1/audio/transcriptions',
-                    headers={'Authorization': f'Bearer {api_key}'},
-                    files={'file': audio_file},
-                    data={
-                        'model': 'whisper-1',
-                        'language': 'en',  # Force English language
-                        'response_format': 'json'
-                    }
-                )
+            if _HTTP_SESSION is None:
+                raise RuntimeError("requests module not available")
             
-            # Clean up temp file
-            os.unlink(temp_audio_path)
+            # Send the in-memory audio to OpenAI Whisper API
+            response = _HTTP_SESSION.post(
+                'https://api.openai.com/v1/audio/transcriptions',
+                headers={'Authorization': f'Bearer {api_key}'},
+                files={'file': ('audio.wav', io.BytesIO(audio_data), 'audio/wav')},
+                data={
+                    'model': 'whisper-1',
+                    'language': 'en',  # Force English language
+                    'response_format': 'json'
+                },
+                timeout=WHISPER_TIMEOUT
+            )
             
             if response.status_code == 200:
                 result = response.json()
@@ -514,8 +987,8 @@ class handler(BaseHTTPRequestHandler):
                 # Generate AI response to the transcribed text
                 ai_response = self.generate_voice_response(transcript)
                 
-                # Generate TTS audio for the AI response
-                tts_audio = self.generate_speech_with_elevenlabs(ai_response)
+                # Start TTS audio for the AI response in the background
+                tts_future = self.start_speech_generation(ai_response)
                 
                 response_data = {
                     'transcript': transcript,
@@ -525,11 +998,12 @@ class handler(BaseHTTPRequestHandler):
                 }
                 
                 # Add TTS audio if available
+                tts_audio = tts_future.result()
                 if tts_audio:
-                    print("Whisper: ElevenLabs TTS audio generated successfully")
+                    logger.debug("Whisper: ElevenLabs TTS audio generated successfully")
                     response_data.update(tts_audio)
                 else:
-                    print("Whisper: ElevenLabs TTS failed, browser fallback will be used")
+                    logger.warning("Whisper: ElevenLabs TTS failed, browser fallback will be used")
                     response_data['tts_status'] = 'elevenlabs_failed'
                 
                 return response_data
@@ -550,20 +1024,13 @@ class handler(BaseHTTPRequestHandler):
         # Analyze audio characteristics for a more realistic simulation
         audio_length = len(audio_data)
         
-        if audio_length < 1000:
-            simulated_transcript = "What are the key risks in this contract?"
-        elif audio_length < 5000:
-            simulated_transcript = "Can you explain the termination clause in my employment agreement?"
-        elif audio_length < 10000:
-            simulated_transcript = "I'm concerned about the confidentiality terms. Are they too broad?"
-        else:
-            simulated_transcript = "Please review the intellectual property section and tell me if there are any issues I should be aware of."
+        simulated_transcript = _SIMULATED_TRANSCRIPTS[bisect_right(_SIMULATED_TRANSCRIPT_LENGTHS, audio_length)]
         
         # Generate AI response
         ai_response = self.generate_voice_response(simulated_transcript)
         
-        # Generate TTS audio for the AI response
-        tts_audio = self.generate_speech_with_elevenlabs(ai_response)
+        # Start TTS audio for the AI response in the background
+        tts_future = self.start_speech_generation(ai_response)
         
         response_data = {
             'transcript': simulated_transcript,
@@ -576,6 +1043,7 @@ class handler(BaseHTTPRequestHandler):
         }
         
         # Add TTS audio if available
+        tts_audio = tts_future.result()
         if tts_audio:
             response_data.update(tts_audio)
         
@@ -588,129 +1056,256 @@ class handler(BaseHTTPRequestHandler):
             if not api_key:
                 return self.get_fallback_voice_response(transcript)
             
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
+            # Repeated questions (FAQs, simulated transcripts) skip Gemini
+            cache_key = _voice_response_cache_key(transcript)
+            cached_response = _voice_response_cache_get(cache_key)
+            if cached_response is not None:
+                return cached_response
             
-            # Create voice-optimized prompt
-            voice_prompt = f"""You are NyayMitra AI, a legal assistant. The user asked via voice: "{transcript}"
-
-Provide a conversational, voice-friendly response that:
-- Directly answers their question
-- Uses natural, spoken language (not written)
-- Keeps responses under 200 words for voice playback
-- Focuses on key points they need to know
-- Includes a brief disclaimer about consulting lawyers for binding advice
-
-Response:"""
-
-            response = model.generate_content(voice_prompt)
-            return response.text.strip()
+            with _VOICE_RESPONSE_INFLIGHT_LOCK:
+                future = _VOICE_RESPONSE_INFLIGHT.get(cache_key)
+                leader = future is None
+                if leader:
+                    future = _VOICE_RESPONSE_INFLIGHT[cache_key] = Future()
+            
+            if not leader:
+                logger.debug("Voice response in flight for %s, waiting", cache_key)
+                return future.result(timeout=GEMINI_TIMEOUT)
+            
+            try:
+                model = _gemini_model(api_key)
+                
+                response = model.generate_content(
+                    _VOICE_PROMPT_TEMPLATE.format(transcript=transcript),
+                    request_options=_GEMINI_REQUEST_OPTIONS
+                )
+                voice_response = response.text.strip()
+                _voice_response_cache_set(cache_key, voice_response)
+                future.set_result(voice_response)
+                return voice_response
+            except BaseException as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with _VOICE_RESPONSE_INFLIGHT_LOCK:
+                    del _VOICE_RESPONSE_INFLIGHT[cache_key]
             
         except Exception as e:
-            print(f"Voice response generation error: {e}")
+            logger.warning("Voice response generation error: %s", e)
             return self.get_fallback_voice_response(transcript)
 
     def get_fallback_voice_response(self, transcript):
         """Provide intelligent fallback voice response"""
+        # Lowercase once and find every keyword in a single regex scan
         transcript_lower = transcript.lower()
+        topics = {_FALLBACK_KEYWORD_TOPICS[m.group(1)] for m in _FALLBACK_KEYWORD_RE.finditer(transcript_lower)}
         
-        # Analyze transcript for key topics
-        if 'risk' in transcript_lower or 'dangerous' in transcript_lower:
-            return "Great question about contract risks. Key areas to watch include termination terms, liability clauses, and intellectual property assignments. These can significantly impact your rights and obligations. I'd recommend having a lawyer review any concerning sections before signing."
-        
-        elif 'termination' in transcript_lower or 'quit' in transcript_lower or 'fire' in transcript_lower:
-            return "Termination clauses are crucial to understand. Look for notice requirements, severance terms, and any post-employment restrictions. Most contracts require two to four weeks notice, but this varies. Make sure the terms are fair and reasonable for your situation."
-        
-        elif 'confidential' in transcript_lower or 'nda' in transcript_lower:
-            return "Confidentiality terms protect company information but shouldn't be overly broad. They should clearly define what's confidential and allow you to use general skills and knowledge in future roles. Be cautious of indefinite time periods or unclear scope."
-        
-        elif 'intellectual property' in transcript_lower or 'ip' in transcript_lower:
-            return "Intellectual property clauses determine who owns work you create. Company ownership of work-related inventions is standard, but be careful of clauses claiming personal projects or pre-existing IP. Ensure the scope is reasonable and job-related."
+        # First matching topic in priority order picks the canned response
+        for topic in _FALLBACK_TOPIC_PRIORITY:
+            if topic in topics:
+                return _FALLBACK_RESPONSES[topic]
         
-        elif 'payment' in transcript_lower or 'salary' in transcript_lower:
-            return "Payment terms should be clear and protected. Look for guaranteed amounts, payment schedules, and expense policies. Ensure any performance-based pay has objective criteria. You should also understand overtime policies and benefit contributions."
+        return f"Thanks for your question about {transcript}. I'm here to help with contract analysis and legal guidance. For detailed advice on your specific situation, I recommend uploading your contract for comprehensive review, or consulting with a qualified attorney for binding legal advice."
+
+    def start_speech_generation(self, text):
+        """Start ElevenLabs TTS for text in the background and return its future.
+
+        Concurrent requests for the same text share the in-flight future, so
+        a burst of identical responses costs one upstream call. Clients that
+        asked for streamed audio instead get a tts_stream_url to POST to; it
+        names text registered here, so only server-generated responses can
+        be synthesized, and nothing is synthesized until then.
+        """
+        if self.stream_tts:
+            token = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+            _tts_text_set(token, text)
+            future = Future()
+            future.set_result({'tts_stream_url': f"{urlsplit(self.path).path}?tts_token={token}"})
+            return future
         
+        key = self.tts_cache_key(text)
+        with _TTS_INFLIGHT_LOCK:
+            future = _TTS_INFLIGHT.get(key)
+            if future is not None:
+                return future
+            future = _TTS_EXECUTOR.submit(self.generate_speech_with_elevenlabs, text)
+            _TTS_INFLIGHT[key] = future
+        future.add_done_callback(lambda done: _tts_inflight_finished(key, done))
+        return future
+
+    def build_tts_request(self, text, api_key):
+        """Build the ElevenLabs streaming TTS url, headers and payload"""
+        data = {
+            "text": text,
+            "model_id": ELEVENLABS_MODEL_ID,
+            "voice_settings": _TTS_VOICE_SETTINGS
+        }
+        return ELEVENLABS_TTS_URL, _tts_headers(api_key), data
+
+    def tts_cache_key(self, text):
+        """Cache key for the synthesized audio of text"""
+        return f"tts:{ELEVENLABS_VOICE_ID}:{hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()}"
+
+    def send_cors_response(self, status):
+        """Start a response with status and the CORS headers every reply carries"""
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+
+    def send_json(self, status, body):
+        """Send a complete JSON response, compressed when worthwhile"""
+        self.send_cors_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers_with_body(self.encode_body(body))
+
+    def end_headers_with_body(self, body):
+        """Finish the response head and send it together with body.
+
+        Sets Content-Length and emits head and body in one write, so Nagle's
+        algorithm cannot hold the body back behind the header segment.
+        """
+        self.send_header('Content-Length', str(len(body)))
+        self._headers_buffer.append(b"\r\n" + body)
+        self.flush_headers()
+
+    def encode_body(self, body):
+        """Compress a JSON body the client accepts compressed, adding its headers.
+
+        Responses carrying base64 audio are large, and compression wins back
+        most of the base64 inflation. Small bodies are sent as they are.
+        """
+        if len(body) < COMPRESS_MIN_SIZE:
+            return body
+        accept_encoding = self.headers.get('Accept-Encoding', '')
+        if brotli is not None and 'br' in accept_encoding:
+            encoding, body = 'br', brotli.compress(body, quality=4)
+        elif 'gzip' in accept_encoding:
+            encoding, body = 'gzip', gzip.compress(body, compresslevel=5)
+        else:
+            return body
+        self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        return body
+
+    def send_audio_headers(self, body=None):
+        """Send a 200 audio/mpeg response head, with body if it is known up front"""
+        self.send_cors_response(200)
+        self.send_header('Content-Type', 'audio/mpeg')
+        if body is not None:
+            self.end_headers_with_body(body)
         else:
-            return f"Thanks for your question about {transcript}. I'm here to help with contract analysis and legal guidance. For detailed advice on your specific situation, I recommend uploading your contract for comprehensive review, or consulting with a qualified attorney for binding legal advice."
+            self.end_headers()
+
+    def stream_speech_with_elevenlabs(self, text):
+        """Stream ElevenLabs TTS audio to the client as it is synthesized.
+
+        Returns False without writing anything if TTS is unavailable, so the
+        caller can still send a JSON error.
+        """
+        streaming = False
+        try:
+            if not ELEVENLABS_AVAILABLE:
+                logger.warning("ElevenLabs TTS stream: requests module not available")
+                return False
+            
+            api_key = os.getenv('ELEVEN_API_KEY') or os.getenv('ELEVENLABS_API_KEY')
+            if not api_key:
+                logger.warning("ElevenLabs TTS stream: API key not found. Checked ELEVEN_API_KEY and ELEVENLABS_API_KEY")
+                return False
+            
+            cache_key = self.tts_cache_key(text)
+            cached_audio = _tts_cache_get(cache_key)
+            if cached_audio:
+                logger.debug("ElevenLabs TTS stream: Cache hit - audio size: %s bytes", len(cached_audio))
+                self.send_audio_headers(cached_audio)
+                return True
+            
+            url, headers, data = self.build_tts_request(text, api_key)
+            with _HTTP_SESSION.post(url, json=data, headers=headers, timeout=ELEVENLABS_TIMEOUT, stream=True) as response:
+                if response.status_code != 200:
+                    logger.warning("ElevenLabs TTS stream: API error %s: %s", response.status_code, response.text)
+                    return False
+                
+                # HTTP/1.0 response: the body ends when the connection closes
+                self.send_audio_headers()
+                streaming = True
+                raw_chunks = []
+                for chunk in response.iter_content(4096):
+                    self.wfile.write(chunk)
+                    raw_chunks.append(chunk)
+            
+            if raw_chunks:
+                _tts_cache_set(cache_key, b''.join(raw_chunks))
+            return True
+            
+        except Exception as e:
+            logger.warning("ElevenLabs TTS stream: Exception occurred: %s: %s", type(e).__name__, e)
+            # Once audio headers are out the response can only be cut short
+            return streaming
 
     def generate_speech_with_elevenlabs(self, text):
         """Generate speech using ElevenLabs TTS API"""
         try:
-            print(f"ElevenLabs TTS: Starting generation for text length: {len(text)}")
+            logger.debug("ElevenLabs TTS: Starting generation for text length: %s", len(text))
             
             if not ELEVENLABS_AVAILABLE:
-                print("ElevenLabs TTS: requests module not available")
+                logger.warning("ElevenLabs TTS: requests module not available")
                 return None
                 
             api_key = os.getenv('ELEVEN_API_KEY') or os.getenv('ELEVENLABS_API_KEY')
             if not api_key:
-                print("ElevenLabs TTS: API key not found. Checked ELEVEN_API_KEY and ELEVENLABS_API_KEY")
+                logger.warning("ElevenLabs TTS: API key not found. Checked ELEVEN_API_KEY and ELEVENLABS_API_KEY")
                 return None
             
-            print(f"ElevenLabs TTS: API key found (first 8 chars): {api_key[:8]}...")
-            print(f"ElevenLabs TTS: Generating for text: {text[:100]}...")
-            
-            # ElevenLabs API endpoint and voice
-            voice_id = "21m00Tcm4TlvDq8ikWAM"  # Rachel voice (professional female)
-            url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+            logger.debug("ElevenLabs TTS: API key found (first 8 chars): %s...", api_key[:8])
+            logger.debug("ElevenLabs TTS: Generating for text: %s...", text[:100])
             
-            headers = {
-                "Accept": "audio/mpeg",
-                "Content-Type": "application/json",
-                "xi-api-key": api_key
-            }
+            url, headers, data = self.build_tts_request(text, api_key)
             
-            data = {
-                "text": text,
-                "model_id": "eleven_monolingual_v1",
-                "voice_settings": {
-                    "stability": 0.5,
-                    "similarity_boost": 0.5,
-                    "style": 0.3,
-                    "use_speaker_boost": True
+            # Serve repeated responses from the shared cache
+            cache_key = self.tts_cache_key(text)
+            cached_audio = _tts_cache_get(cache_key)
+            if cached_audio:
+                logger.debug("ElevenLabs TTS: Cache hit - audio size: %s bytes", len(cached_audio))
+                return {
+                    'audio_data': _b64.b64encode(cached_audio).decode('ascii'),
+                    'audio_format': 'mp3',
+                    'content_type': 'audio/mpeg'
                 }
-            }
-            
-            print("ElevenLabs TTS: Making API request...")
-            response = requests.post(url, json=data, headers=headers, timeout=30)
             
-            print(f"ElevenLabs TTS: Response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                audio_size = len(response.content)
-                print(f"ElevenLabs TTS: Success - audio size: {audio_size} bytes")
+            logger.debug("ElevenLabs TTS: Making API request...")
+            with _HTTP_SESSION.post(url, json=data, headers=headers, timeout=ELEVENLABS_TIMEOUT, stream=True) as response:
+                logger.debug("ElevenLabs TTS: Response status: %s", response.status_code)
                 
-                if audio_size == 0:
-                    print("ElevenLabs TTS: Warning - empty audio response")
+                if response.status_code != 200:
+                    logger.warning("ElevenLabs TTS: API error %s: %s", response.status_code, response.text)
                     return None
                 
-                # Return base64 encoded audio
-                audio_base64 = base64.b64encode(response.content).decode('utf-8')
-                print(f"ElevenLabs TTS: Base64 encoded audio length: {len(audio_base64)}")
-                
-                return {
-                    'audio_data': audio_base64,
-                    'audio_format': 'mp3',
-                    'content_type': 'audio/mpeg'
-                }
-            else:
-                print(f"ElevenLabs TTS: API error {response.status_code}: {response.text}")
+                # Base64-encode the audio as it streams in, keeping the raw
+                # chunks for the cache
+                raw_chunks = []
+                audio_base64, audio_size = _b64encode_stream(response, raw_chunks=raw_chunks)
+            
+            logger.debug("ElevenLabs TTS: Success - audio size: %s bytes", audio_size)
+            
+            if audio_size == 0:
+                logger.warning("ElevenLabs TTS: Warning - empty audio response")
                 return None
+            
+            _tts_cache_set(cache_key, b''.join(raw_chunks))
+            
+            logger.debug("ElevenLabs TTS: Base64 encoded audio length: %s", len(audio_base64))
+            
+            return {
+                'audio_data': audio_base64,
+                'audio_format': 'mp3',
+                'content_type': 'audio/mpeg'
+            }
                 
         except Exception as e:
-            print(f"ElevenLabs TTS: Exception occurred: {type(e).__name__}: {str(e)}")
-            import traceback
-            print(f"ElevenLabs TTS: Full traceback: {traceback.format_exc()}")
+            logger.exception("ElevenLabs TTS: Exception occurred: %s: %s", type(e).__name__, e)
             return None
 
     def do_GET(self):
-        self.send_response(405)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Content-Type', 'application/json')
-        self.end_headers()
-        
-        error_response = {
-            'error': 'Method not allowed. Use POST for audio transcription.',
-            'status': 'error'
-        }
-        self.wfile.write(json.dumps(error_response).encode())
+        self.send_json(405, _GET_NOT_ALLOWED_BODY)
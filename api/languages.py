@@ -1,240 +1,262 @@
+import gzip
+import hashlib
 import json
 from http.server import BaseHTTPRequestHandler
 
+# Supported languages for contract analysis
+LANGUAGES = {
+    'en': {
+        'name': 'English',
+        'native_name': 'English',
+        'code': 'en',
+        'supported_features': ['analysis', 'translation', 'tts', 'stt'],
+        'default': True
+    },
+    'hi': {
+        'name': 'Hindi',
+        'native_name': 'हिन्दी',
+        'code': 'hi',
+        'supported_features': ['analysis', 'translation', 'tts'],
+        'default': False
+    },
+    'bn': {
+        'name': 'Bengali',
+        'native_name': 'বাংলা',
+        'code': 'bn',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'te': {
+        'name': 'Telugu',
+        'native_name': 'తెలుగు',
+        'code': 'te',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'ta': {
+        'name': 'Tamil',
+        'native_name': 'தமிழ்',
+        'code': 'ta',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'mr': {
+        'name': 'Marathi',
+        'native_name': 'मराठी',
+        'code': 'mr',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'gu': {
+        'name': 'Gujarati',
+        'native_name': 'ગુજરાતી',
+        'code': 'gu',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'kn': {
+        'name': 'Kannada',
+        'native_name': 'ಕನ್ನಡ',
+        'code': 'kn',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'ml': {
+        'name': 'Malayalam',
+        'native_name': 'മലയാളം',
+        'code': 'ml',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'pa': {
+        'name': 'Punjabi',
+        'native_name': 'ਪੰਜਾਬੀ',
+        'code': 'pa',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'or': {
+        'name': 'Odia',
+        'native_name': 'ଓଡ଼ିଆ',
+        'code': 'or',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'as': {
+        'name': 'Assamese',
+        'native_name': 'অসমীয়া',
+        'code': 'as',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'ur': {
+        'name': 'Urdu',
+        'native_name': 'اردو',
+        'code': 'ur',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'es': {
+        'name': 'Spanish',
+        'native_name': 'Español',
+        'code': 'es',
+        'supported_features': ['analysis', 'translation', 'tts'],
+        'default': False
+    },
+    'fr': {
+        'name': 'French',
+        'native_name': 'Français',
+        'code': 'fr',
+        'supported_features': ['analysis', 'translation', 'tts'],
+        'default': False
+    },
+    'de': {
+        'name': 'German',
+        'native_name': 'Deutsch',
+        'code': 'de',
+        'supported_features': ['analysis', 'translation', 'tts'],
+        'default': False
+    },
+    'zh': {
+        'name': 'Chinese (Simplified)',
+        'native_name': '中文 (简体)',
+        'code': 'zh',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'ja': {
+        'name': 'Japanese',
+        'native_name': '日本語',
+        'code': 'ja',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'ko': {
+        'name': 'Korean',
+        'native_name': '한국어',
+        'code': 'ko',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'ar': {
+        'name': 'Arabic',
+        'native_name': 'العربية',
+        'code': 'ar',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'pt': {
+        'name': 'Portuguese',
+        'native_name': 'Português',
+        'code': 'pt',
+        'supported_features': ['analysis', 'translation', 'tts'],
+        'default': False
+    },
+    'ru': {
+        'name': 'Russian',
+        'native_name': 'Русский',
+        'code': 'ru',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'it': {
+        'name': 'Italian',
+        'native_name': 'Italiano',
+        'code': 'it',
+        'supported_features': ['analysis', 'translation', 'tts'],
+        'default': False
+    },
+    'nl': {
+        'name': 'Dutch',
+        'native_name': 'Nederlands',
+        'code': 'nl',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'pl': {
+        'name': 'Polish',
+        'native_name': 'Polski',
+        'code': 'pl',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    },
+    'sv': {
+        'name': 'Swedish',
+        'native_name': 'Svenska',
+        'code': 'sv',
+        'supported_features': ['analysis', 'translation'],
+        'default': False
+    }
+}
+
+_RESPONSE_DATA = {
+    'status': 'success',
+    'languages': LANGUAGES,
+    'total_count': len(LANGUAGES),
+    'default_language': 'en',
+    'features': {
+        'analysis': 'Contract risk analysis',
+        'translation': 'Multi-language translation',
+        'tts': 'Text-to-speech synthesis',
+        'stt': 'Speech-to-text transcription'
+    }
+}
+
+# The catalog is static, so the response body, its gzip encoding and their
+# ETags are built once per process instead of on every GET. Each encoding is
+# a different representation, so each gets its own strong ETag.
+_RESPONSE_JSON = json.dumps(_RESPONSE_DATA).encode()
+_RESPONSE_GZIP = gzip.compress(_RESPONSE_JSON, compresslevel=6)
+_RESPONSE_DIGEST = hashlib.md5(_RESPONSE_JSON).hexdigest()
+_ETAG = '"%s"' % _RESPONSE_DIGEST
+_GZIP_ETAG = '"%s-gz"' % _RESPONSE_DIGEST
+_POST_NOT_ALLOWED_BODY = json.dumps({
+    'error': 'Method not allowed',
+    'status': 'error'
+}).encode()
+
 class handler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        self.send_cors_response(200)
         self.end_headers()
 
     def do_GET(self):
-        try:
-            self.send_response(200)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Content-Type', 'application/json')
+        accepts_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        etag = _GZIP_ETAG if accepts_gzip else _ETAG
+        
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(',')):
+            self.send_cors_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
             self.end_headers()
-            # Supported languages for contract analysis
-            languages = {
-                'en': {
-                    'name': 'English',
-                    'native_name': 'English',
-                    'code': 'en',
-                    'supported_features': ['analysis', 'translation', 'tts', 'stt'],
-                    'default': True
-                },
-                'hi': {
-                    'name': 'Hindi',
-                    'native_name': 'हिन्दी',
-                    'code': 'hi',
-                    'supported_features': ['analysis', 'translation', 'tts'],
-                    'default': False
-                },
-                'bn': {
-                    'name': 'Bengali',
-                    'native_name': 'বাংলা',
-                    'code': 'bn',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'te': {
-                    'name': 'Telugu',
-                    'native_name': 'తెలుగు',
-                    'code': 'te',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'ta': {
-                    'name': 'Tamil',
-                    'native_name': 'தமிழ்',
-                    'code': 'ta',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'mr': {
-                    'name': 'Marathi',
-                    'native_name': 'मराठी',
-                    'code': 'mr',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'gu': {
-                    'name': 'Gujarati',
-                    'native_name': 'ગુજરાતી',
-                    'code': 'gu',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'kn': {
-                    'name': 'Kannada',
-                    'native_name': 'ಕನ್ನಡ',
-                    'code': 'kn',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'ml': {
-                    'name': 'Malayalam',
-                    'native_name': 'മലയാളം',
-                    'code': 'ml',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'pa': {
-                    'name': 'Punjabi',
-                    'native_name': 'ਪੰਜਾਬੀ',
-                    'code': 'pa',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'or': {
-                    'name': 'Odia',
-                    'native_name': 'ଓଡ଼ିଆ',
-                    'code': 'or',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'as': {
-                    'name': 'Assamese',
-                    'native_name': 'অসমীয়া',
-                    'code': 'as',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'ur': {
-                    'name': 'Urdu',
-                    'native_name': 'اردو',
-                    'code': 'ur',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'es': {
-                    'name': 'Spanish',
-                    'native_name': 'Español',
-                    'code': 'es',
-                    'supported_features': ['analysis', 'translation', 'tts'],
-                    'default': False
-                },
-                'fr': {
-                    'name': 'French',
-                    'native_name': 'Français',
-                    'code': 'fr',
-                    'supported_features': ['analysis', 'translation', 'tts'],
-                    'default': False
-                },
-                'de': {
-                    'name': 'German',
-                    'native_name': 'Deutsch',
-                    'code': 'de',
-                    'supported_features': ['analysis', 'translation', 'tts'],
-                    'default': False
-                },
-                'zh': {
-                    'name': 'Chinese (Simplified)',
-                    'native_name': '中文 (简体)',
-                    'code': 'zh',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'ja': {
-                    'name': 'Japanese',
-                    'native_name': '日本語',
-                    'code': 'ja',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'ko': {
-                    'name': 'Korean',
-                    'native_name': '한국어',
-                    'code': 'ko',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'ar': {
-                    'name': 'Arabic',
-                    'native_name': 'العربية',
-                    'code': 'ar',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'pt': {
-                    'name': 'Portuguese',
-                    'native_name': 'Português',
-                    'code': 'pt',
-                    'supported_features': ['analysis', 'translation', 'tts'],
-                    'default': False
-                },
-                'ru': {
-                    'name': 'Russian',
-                    'native_name': 'Русский',
-                    'code': 'ru',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'it': {
-                    'name': 'Italian',
-                    'native_name': 'Italiano',
-                    'code': 'it',
-                    'supported_features': ['analysis', 'translation', 'tts'],
-                    'default': False
-                },
-                'nl': {
-                    'name': 'Dutch',
-                    'native_name': 'Nederlands',
-                    'code': 'nl',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'pl': {
-                    'name': 'Polish',
-                    'native_name': 'Polski',
-                    'code': 'pl',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                },
-                'sv': {
-                    'name': 'Swedish',
-                    'native_name': 'Svenska',
-                    'code': 'sv',
-                    'supported_features': ['analysis', 'translation'],
-                    'default': False
-                }
-            }
-            
-            response_data = {
-                'status': 'success',
-                'languages': languages,
-                'total_count': len(languages),
-                'default_language': 'en',
-                'features': {
-                    'analysis': 'Contract risk analysis',
-                    'translation': 'Multi-language translation',
-                    'tts': 'Text-to-speech synthesis',
-                    'stt': 'Speech-to-text transcription'
-                }
-            }
-            
-            return {
-                'statusCode': 200,
-                'headers': headers,
-                'body': json.dumps(response_data)
-            }
-            
-        except Exception as e:
-            return {
-                'statusCode': 500,
-                'headers': headers,
-                'body': json.dumps({
-                    'error': f'Languages endpoint error: {str(e)}',
-                    'status': 'error'
-                })
-            }
-    
-    return {
-        'statusCode': 405,
-        'headers': headers,
-        'body': json.dumps({
-            'error': 'Method not allowed',
-            'status': 'error'
-        })
-    }
\ No newline at end of file
+            return
+        
+        body = _RESPONSE_GZIP if accepts_gzip else _RESPONSE_JSON
+        
+        self.send_cors_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        if accepts_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.end_headers_with_body(body)
+
+    def do_POST(self):
+        self.send_cors_response(405)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers_with_body(_POST_NOT_ALLOWED_BODY)
+
+    def send_cors_response(self, status):
+        """Send the status line followed by the CORS headers"""
+        self.send_response(status)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+
+    def end_headers_with_body(self, body):
+        """Finish the response head with Content-Length and send it and body
+        in one write, instead of a header flush plus a separate body write."""
+        self.send_header('Content-Length', str(len(body)))
+        self._headers_buffer.append(b"\r\n" + body)
+        self.flush_headers()
@@ -6,6 +6,7 @@ Handles: health, test, rate-limit-status, translator-metrics
 import json
 import os
 import sys
+import time
 from urllib.parse import parse_qs
 
 # Add the current directory to Python path for imports
@@ -50,7 +51,7 @@ def main(event, context):
 def handle_rate_limit_status(event, context):
     """Handle rate limit status check."""
     try:
-        status = rate_limiter.get_status()
+        status = rate_limiter.get_statistics()
         
         # Add warnings if approaching limits
         warnings = []
@@ -76,11 +77,11 @@ def handle_rate_limit_reset(event, context):
     try:
         # Only allow in development/debug mode
         if Config.DEBUG:
-            rate_limiter.reset_limits()
+            rate_limiter.reset_statistics()
             return create_response({
                 'status': 'success',
                 'message': 'Rate limits reset successfully',
-                'timestamp': rate_limiter.get_current_time()
+                'timestamp': time.time()
             })
         else:
             return create_response({
@@ -149,7 +150,7 @@ def handle_health(event, context):
         # Check system components
         health_status = {
             'status': 'healthy',
-            'timestamp': rate_limiter.get_current_time(),
+            'timestamp': time.time(),
             'version': '2.0.0-netlify',
             'environment': 'production' if not Config.DEBUG else 'development',
             'components': {
@@ -176,54 +177,63 @@ def handle_health(event, context):
         return create_response({
             'status': 'unhealthy',
             'error': f'Health check failed: {str(e)}',
-            'timestamp': rate_limiter.get_current_time()
+            'timestamp': time.time()
         }, 500)
 
+def _build_test_report():
+    """Configuration report for the test action, minus the timestamp."""
+    report = {
+        'config': {
+            'gemini_model': Config.GEMINI_MODEL,
+            'api_key_present': bool(Config.GEMINI_API_KEY),
+            'api_key_length': len(Config.GEMINI_API_KEY) if Config.GEMINI_API_KEY else 0,
+            'elevenlabs_configured': bool(Config.ELEVEN_API_KEY),
+            'voice_id_configured': bool(Config.VOICE_ID),
+            'debug_mode': Config.DEBUG
+        },
+        'rate_limiting': {
+            'max_requests_per_minute': Config.MAX_REQUESTS_PER_MINUTE,
+            'sleep_between_requests': Config.SLEEP_BETWEEN_REQUESTS,
+            'circuit_breaker_failures': Config.CIRCUIT_BREAKER_FAILURES,
+            'circuit_breaker_timeout': Config.CIRCUIT_BREAKER_TIMEOUT
+        },
+        'netlify_functions': [
+            'analyze',
+            'chat',
+            'admin', 
+            'languages'
+        ]
+    }
+    
+    # Add warnings for missing configuration
+    warnings = []
+    if not Config.GEMINI_API_KEY:
+        warnings.append('Gemini API key not configured')
+    if not Config.ELEVEN_API_KEY:
+        warnings.append('ElevenLabs API key not configured (voice features disabled)')
+    
+    if warnings:
+        report['warnings'] = warnings
+    
+    return report
+
+# Config is read from the environment once at import, so the report is too
+_TEST_REPORT = _build_test_report()
+
 def handle_test(event, context):
     """Handle configuration test."""
     try:
-        test_results = {
+        return create_response({
             'status': 'success',
-            'timestamp': rate_limiter.get_current_time(),
-            'config': {
-                'gemini_model': Config.GEMINI_MODEL,
-                'api_key_present': bool(Config.GEMINI_API_KEY),
-                'api_key_length': len(Config.GEMINI_API_KEY) if Config.GEMINI_API_KEY else 0,
-                'elevenlabs_configured': bool(Config.ELEVEN_API_KEY),
-                'voice_id_configured': bool(Config.VOICE_ID),
-                'debug_mode': Config.DEBUG
-            },
-            'rate_limiting': {
-                'max_requests_per_minute': Config.MAX_REQUESTS_PER_MINUTE,
-                'sleep_between_requests': Config.SLEEP_BETWEEN_REQUESTS,
-                'circuit_breaker_failures': Config.CIRCUIT_BREAKER_FAILURES,
-                'circuit_breaker_timeout': Config.CIRCUIT_BREAKER_TIMEOUT
-            },
-            'netlify_functions': [
-                'analyze',
-                'chat',
-                'admin', 
-                'languages'
-            ]
-        }
-        
-        # Add warnings for missing configuration
-        warnings = []
-        if not Config.GEMINI_API_KEY:
-            warnings.append('Gemini API key not configured')
-        if not Config.ELEVEN_API_KEY:
-            warnings.append('ElevenLabs API key not configured (voice features disabled)')
-        
-        if warnings:
-            test_results['warnings'] = warnings
-        
-        return create_response(test_results)
+            'timestamp': time.time(),
+            **_TEST_REPORT
+        })
         
     except Exception as e:
         return create_response({
             'status': 'failed',
             'error': f'Configuration test failed: {str(e)}',
-            'timestamp': rate_limiter.get_current_time()
+            'timestamp': time.time()
         }, 500)
 
 # Netlify Functions entry point
@@ -13,10 +13,18 @@ class ConversationAgent:
         self.api_key = api_key or Config.GEMINI_API_KEY
         genai.configure(api_key=self.api_key)
         self.model_name = Config.GEMINI_MODEL
+        self._model = None
         
         # In-memory session storage (for serverless, consider using external storage)
         self.sessions = {}
     
+    @property
+    def model(self):
+        """Gemini model for model_name, built on first use."""
+        if self._model is None:
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+    
     def process_message(self, message: str, session_id: Optional[str] = None, 
                        contract_context: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -167,7 +175,7 @@ class ConversationAgent:
             Provide a helpful, accurate response. If the question is about a specific contract and you have contract context, reference it appropriately. Keep responses concise but informative.
             """
             
-            model = genai.GenerativeModel(self.model_name)
+            model = self.model
             response = model.generate_content(prompt)
             
             if response and response.text:
@@ -200,7 +208,7 @@ class ConversationAgent:
             Provide numbered responses corresponding to each question. Keep each response focused and helpful.
             """
             
-            model = genai.GenerativeModel(self.model_name)
+            model = self.model
             response = model.generate_content(prompt)
             
             if response and response.text:
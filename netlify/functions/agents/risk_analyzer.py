@@ -11,6 +11,14 @@ class RiskAnalyzerAgent:
         self.api_key = api_key or Config.GEMINI_API_KEY
         genai.configure(api_key=self.api_key)
         self.model_name = Config.GEMINI_MODEL
+        self._model = None
+    
+    @property
+    def model(self):
+        """Gemini model for model_name, built on first use."""
+        if self._model is None:
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
     
     def analyze_risks(self, contract_text: str) -> Dict[str, Any]:
         """
@@ -68,7 +76,7 @@ class RiskAnalyzerAgent:
             """
             
             # Generate risk analysis
-            model = genai.GenerativeModel(self.model_name)
+            model = self.model
             response = model.generate_content(prompt)
             
             if not response or not response.text:
@@ -188,7 +196,7 @@ class RiskAnalyzerAgent:
             Provide a structured analysis for each requested clause type.
             """
             
-            model = genai.GenerativeModel(self.model_name)
+            model = self.model
             response = model.generate_content(prompt)
             
             if not response or not response.text:
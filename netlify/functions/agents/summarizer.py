@@ -11,6 +11,14 @@ class SummarizerAgent:
         self.api_key = api_key or Config.GEMINI_API_KEY
         genai.configure(api_key=self.api_key)
         self.model_name = Config.GEMINI_MODEL
+        self._model = None
+    
+    @property
+    def model(self):
+        """Gemini model for model_name, built on first use."""
+        if self._model is None:
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
     
     def generate_summary(self, contract_text: str) -> Dict[str, Any]:
         """
@@ -53,7 +61,7 @@ class SummarizerAgent:
             """
             
             # Generate summary using Gemini
-            model = genai.GenerativeModel(self.model_name)
+            model = self.model
             response = model.generate_content(prompt)
             
             if not response or not response.text:
@@ -116,7 +124,7 @@ class SummarizerAgent:
             Format as a structured list.
             """
             
-            model = genai.GenerativeModel(self.model_name)
+            model = self.model
             response = model.generate_content(prompt)
             
             if not response or not response.text:
@@ -11,6 +11,7 @@ class TranslatorAgent:
         self.api_key = api_key or Config.GEMINI_API_KEY
         genai.configure(api_key=self.api_key)
         self.model_name = Config.GEMINI_MODEL
+        self._model = None
         
         # Supported languages
         self.supported_languages = {
@@ -44,6 +45,13 @@ class TranslatorAgent:
             "renewal_options"
         ]
     
+    @property
+    def model(self):
+        """Gemini model for model_name, built on first use."""
+        if self._model is None:
+            self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+    
     def get_supported_languages(self) -> Dict[str, str]:
         """Get list of supported languages."""
         return self.supported_languages
@@ -110,7 +118,7 @@ class TranslatorAgent:
             """
             
             # Generate translated summary
-            model = genai.GenerativeModel(self.model_name)
+            model = self.model
             response = model.generate_content(prompt)
             
             if not response or not response.text:
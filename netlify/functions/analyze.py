@@ -7,20 +7,32 @@ import json
 import os
 import sys
 import tempfile
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, TYPE_CHECKING
 
 # Add the current directory to Python path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from config import Config
 from utils import create_response, handle_cors, validate_request
-from agents.moderator import ModeratorAgent
 from agents.rate_limiter import ServerlessRateLimiter
 
+if TYPE_CHECKING:
+    from agents.moderator import ModeratorAgent
+
 # Initialize components
-moderator_agent = ModeratorAgent()
 rate_limiter = ServerlessRateLimiter()
 
+@lru_cache(maxsize=1)
+def get_moderator_agent() -> 'ModeratorAgent':
+    """
+    Shared ModeratorAgent, built on first use. Importing it pulls in
+    google.generativeai and all four agents, which cold starts of the
+    demo upload path never need.
+    """
+    from agents.moderator import ModeratorAgent
+    return ModeratorAgent()
+
 def main(event, context):
     """
     Netlify function handler for contract analysis.
@@ -30,14 +42,6 @@ def main(event, context):
         if event.get('httpMethod') == 'OPTIONS':
             return handle_cors()
         
-        # Parse the event body for Netlify
-        body = event.get('body', '')
-        if isinstance(body, str):
-            try:
-                body = json.loads(body)
-            except:
-                pass
-        
         # Handle file upload (simplified for serverless)
         if event.get('httpMethod') == 'POST':
             return handle_file_upload(event, context)
@@ -126,4 +130,8 @@ if __name__ == '__main__':
     }
     
     result = main(test_event, {})
-    print(json.dumps(result, indent=2))
+    try:
+        import orjson
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode('utf-8'))
+    except ImportError:
+        print(json.dumps(result, indent=2))
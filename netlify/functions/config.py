@@ -27,4 +27,4 @@ class Config:
     # Serverless specific
     TEMP_DIR = "/tmp"  # Netlify temp directory
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-    ALLOWED_EXTENSIONS = {'pdf'}
+    ALLOWED_EXTENSIONS = frozenset({'pdf'})
@@ -13,6 +13,28 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from config import Config
 from utils import create_response, handle_cors
 
+# Static catalog, serialized once per process rather than on every request
+LANGUAGES = {
+    'supported_languages': {
+        'en': 'English',
+        'hi': 'Hindi',
+        'es': 'Spanish', 
+        'fr': 'French',
+        'de': 'German',
+        'zh': 'Chinese',
+        'ja': 'Japanese',
+        'ko': 'Korean',
+        'ar': 'Arabic',
+        'pt': 'Portuguese',
+        'ru': 'Russian',
+        'it': 'Italian'
+    },
+    'default_language': 'en',
+    'total_languages': 12
+}
+
+_LANGUAGES_RESPONSE = create_response(LANGUAGES)
+
 def main(event, context):
     """
     Netlify function handler for supported languages.
@@ -22,26 +44,7 @@ def main(event, context):
         if event.get('httpMethod') == 'OPTIONS':
             return handle_cors()
         
-        languages = {
-            'supported_languages': {
-                'en': 'English',
-                'hi': 'Hindi',
-                'es': 'Spanish', 
-                'fr': 'French',
-                'de': 'German',
-                'zh': 'Chinese',
-                'ja': 'Japanese',
-                'ko': 'Korean',
-                'ar': 'Arabic',
-                'pt': 'Portuguese',
-                'ru': 'Russian',
-                'it': 'Italian'
-            },
-            'default_language': 'en',
-            'total_languages': 12
-        }
-        
-        return create_response(languages)
+        return dict(_LANGUAGES_RESPONSE)
         
     except Exception as e:
         return create_response({
@@ -1,3 +1,4 @@
+import base64
 import json
 import os
 import tempfile
@@ -5,17 +6,32 @@ from typing import Dict, Any, Optional
 from werkzeug.utils import secure_filename
 from config import Config
 
+# Every function response is serialized here, so use orjson when it is
+# installed. OPT_NON_STR_KEYS keeps json.dumps' handling of int/enum keys.
+try:
+    import orjson
+
+    def _dumps(data):
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# Headers every response carries; each response gets its own copy
+_CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization'
+}
+
 def create_response(data: Dict[str, Any], status_code: int = 200) -> tuple:
     """Create a standardized API response."""
     return {
         'statusCode': status_code,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type, Authorization'
-        },
-        'body': json.dumps(data)
+        'headers': dict(_CORS_HEADERS),
+        'body': _dumps(data)
     }
 
 def create_error_response(error: str, status_code: int = 500) -> tuple:
@@ -27,40 +43,39 @@ def create_error_response(error: str, status_code: int = 500) -> tuple:
 
 def allowed_file(filename: str) -> bool:
     """Check if file extension is allowed."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
+    dot = filename.rfind('.')
+    return dot != -1 and filename[dot + 1:].lower() in Config.ALLOWED_EXTENSIONS
 
 def save_uploaded_file(file_content: bytes, filename: str) -> str:
     """Save uploaded file to temporary directory and return path."""
     if not allowed_file(filename):
         raise ValueError("File type not allowed")
     
-    secure_name = secure_filename(filename)
-    temp_path = os.path.join(Config.TEMP_DIR, secure_name)
-    
-    with open(temp_path, 'wb') as f:
+    # A unique temp name keeps concurrent uploads of the same filename apart;
+    # only the sanitized extension is kept from the original name
+    suffix = os.path.splitext(secure_filename(filename))[1]
+    with tempfile.NamedTemporaryFile(dir=Config.TEMP_DIR, suffix=suffix, delete=False) as f:
         f.write(file_content)
     
-    return temp_path
+    return f.name
 
 def cleanup_temp_file(file_path: str) -> None:
     """Clean up temporary file."""
     try:
-        if os.path.exists(file_path):
-            os.remove(file_path)
-    except Exception:
-        pass  # Ignore cleanup errors
+        os.unlink(file_path)
+    except OSError:
+        pass  # Already gone, or not removable; ignore cleanup errors
 
 def parse_request_body(event: Dict[str, Any]) -> Dict[str, Any]:
     """Parse request body from Vercel event."""
     try:
         if event.get('body'):
+            # Both parsers take bytes, so a base64 body is not decoded to str
             if event.get('isBase64Encoded'):
-                import base64
-                body = base64.b64decode(event['body']).decode('utf-8')
+                body = base64.b64decode(event['body'])
             else:
                 body = event['body']
-            return json.loads(body)
+            return _loads(body)
         return {}
     except (json.JSONDecodeError, ValueError):
         return {}
@@ -79,12 +94,7 @@ def handle_cors() -> Dict[str, Any]:
     """Handle CORS for all requests."""
     return {
         'statusCode': 200,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-            'Access-Control-Allow-Headers': 'Content-Type, Authorization'
-        },
+        'headers': dict(_CORS_HEADERS),
         'body': json.dumps({})
     }
 
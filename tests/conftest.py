@@ -0,0 +1,21 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+API_DIR = Path(__file__).resolve().parent.parent / "api"
+
+
+@pytest.fixture
+def load_api_module(monkeypatch):
+    """Import a fresh copy of an api/ endpoint module, with no upstream keys or Redis"""
+    for name in ("GEMINI_API_KEY", "ELEVEN_API_KEY", "ELEVENLABS_API_KEY", "OPENAI_API_KEY", "REDIS_URL"):
+        monkeypatch.delenv(name, raising=False)
+
+    def load(name):
+        spec = importlib.util.spec_from_file_location(f"api_{name}", API_DIR / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    return load
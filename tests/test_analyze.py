@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+
+import pytest
+
+
+class StubModel:
+    """Stands in for the Gemini model: answers with the clause it was asked about"""
+
+    def __init__(self, fail_on=(), delays=None):
+        self.fail_on = fail_on
+        self.delays = delays or {}
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        clause_text = prompt.split("CLAUSE: ", 1)[1].split("\n", 1)[0]
+        with self._lock:
+            self.prompts.append(clause_text)
+        time.sleep(self.delays.get(clause_text, 0))
+        if clause_text in self.fail_on:
+            raise RuntimeError("quota exceeded")
+        analysis = {"risk_level": "Low", "analysis": f"Reviewed: {clause_text}"}
+        return type("Response", (), {"text": json.dumps(analysis)})()
+
+
+@pytest.fixture
+def analyze(load_api_module):
+    return load_api_module("analyze")
+
+
+@pytest.fixture
+def endpoint(analyze):
+    return analyze.handler.__new__(analyze.handler)
+
+
+def use_model(analyze, monkeypatch, model):
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(analyze, "_gemini_model", lambda api_key: model)
+
+
+def test_clause_report_keeps_clause_order(analyze, endpoint, monkeypatch):
+    clauses = {"Clause 1": "Payment is due in 30 days.", "Clause 2": "Either party may terminate.", "Clause 3": "Disputes go to arbitration."}
+    # The first clause finishes last
+    use_model(analyze, monkeypatch, StubModel(delays={"Payment is due in 30 days.": 0.05}))
+
+    report = endpoint.analyze_clauses_with_gemini(clauses, "en")
+
+    assert list(report) == list(clauses)
+    for clause_id, clause_text in clauses.items():
+        assert report[clause_id]["text"] == clause_text
+        assert report[clause_id]["analysis"]["analysis"] == f"Reviewed: {clause_text}"
+
+
+def test_failed_clause_gets_fallback_entry(analyze, endpoint, monkeypatch):
+    clauses = {"Clause 1": "Payment is due in 30 days.", "Clause 2": "Either party may terminate."}
+    use_model(analyze, monkeypatch, StubModel(fail_on={"Either party may terminate."}))
+
+    report = endpoint.analyze_clauses_with_gemini(clauses, "en")
+
+    assert report["Clause 1"]["analysis"]["risk_level"] == "Low"
+    assert report["Clause 2"]["analysis"]["risk_level"] == "Medium"
+    assert report["Clause 2"]["analysis"]["analysis"].startswith("Could not complete AI analysis")
+
+
+def test_raising_clause_task_falls_back_to_mock_report(analyze, endpoint, monkeypatch):
+    clauses = {"Clause 1": "Payment is due in 30 days.", "Clause 2": "Either party may terminate."}
+    use_model(analyze, monkeypatch, StubModel())
+
+    def analyze_clause(model, clause_id, clause_text):
+        raise RuntimeError("worker crashed")
+
+    endpoint.analyze_clause_with_gemini = analyze_clause
+
+    assert endpoint.analyze_clauses_with_gemini(clauses, "en") == endpoint.generate_mock_risk_analysis(clauses)
+
+
+def test_identical_clause_text_is_analyzed_once(analyze, endpoint, monkeypatch):
+    boilerplate = "This agreement is governed by the laws of India."
+    clauses = {"Clause 1": boilerplate, "Clause 2": "Either party may terminate.", "Governing Law": boilerplate}
+    model = StubModel()
+    use_model(analyze, monkeypatch, model)
+
+    report = endpoint.analyze_clauses_with_gemini(clauses, "en")
+
+    assert sorted(model.prompts) == sorted([boilerplate, "Either party may terminate."])
+    assert list(report) == list(clauses)
+    assert report["Clause 1"] == report["Governing Law"]
+
+
+def test_mock_report_entries_are_independent(analyze, endpoint):
+    clauses = {f"Clause {n}": f"Clause text {n}" for n in range(1, 5)}
+    report = endpoint.generate_mock_risk_analysis(clauses)
+
+    report["Clause 1"]["analysis"]["risk_level"] = "Low"
+
+    assert report["Clause 4"]["analysis"]["risk_level"] == "High"
+    assert analyze._MOCK_CLAUSE_ANALYSES[0]["risk_level"] == "High"
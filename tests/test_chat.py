@@ -0,0 +1,57 @@
+import pytest
+
+
+class CountingModel:
+    """Stands in for the Gemini model and records every prompt"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return type("Response", (), {"text": f"Answer {len(self.prompts)}"})()
+
+
+@pytest.fixture
+def chat(load_api_module):
+    return load_api_module("chat")
+
+
+@pytest.fixture
+def model(chat, monkeypatch):
+    model = CountingModel()
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(chat, "_gemini_model", lambda api_key: model)
+    return model
+
+
+@pytest.fixture
+def endpoint(chat):
+    return chat.handler.__new__(chat.handler)
+
+
+def test_same_question_against_different_contracts_is_not_shared(endpoint, model):
+    question = "Can the landlord keep my deposit?"
+    first = endpoint.generate_legal_response(question, {"summary": "Lease for flat 4B", "risk_report": {"Clause 1": "High"}})
+    second = endpoint.generate_legal_response(question, {"summary": "Lease for flat 9C", "risk_report": {"Clause 1": "Low"}})
+
+    assert len(model.prompts) == 2
+    assert first != second
+
+
+def test_repeated_question_against_same_contract_is_cached(endpoint, model):
+    context = {"summary": "Lease for flat 4B", "risk_report": {"Clause 1": "High"}}
+    first = endpoint.generate_legal_response("Can the landlord keep my deposit?", context)
+    second = endpoint.generate_legal_response("can the landlord keep my deposit", dict(context))
+
+    assert len(model.prompts) == 1
+    assert first == second
+
+
+def test_voice_answers_are_keyed_by_contract(endpoint, model):
+    question = "Is there a notice period?"
+    endpoint.generate_voice_optimized_response(question, {"summary": "Employment contract"})
+    endpoint.generate_voice_optimized_response(question, {"summary": "Consulting agreement"})
+    endpoint.generate_voice_optimized_response(question)
+
+    assert len(model.prompts) == 3
@@ -0,0 +1,145 @@
+import io
+
+import pytest
+
+
+@pytest.fixture
+def ct(load_api_module):
+    return load_api_module("chat_transcribe")
+
+
+@pytest.fixture
+def endpoint(ct):
+    # Handler methods under test never touch the socket
+    return ct.handler.__new__(ct.handler)
+
+
+def test_complete_transcription_is_cacheable(endpoint):
+    result = {
+        "transcript": "What does the termination clause mean?",
+        "ai_response": "It lets either party end the contract with notice.",
+        "audio_data": "SUQz",
+    }
+    assert endpoint.is_cacheable_transcription(result)
+    stream_result = dict(result, tts_stream_url="/?tts_token=abc")
+    del stream_result["audio_data"]
+    assert endpoint.is_cacheable_transcription(stream_result)
+
+
+def test_transcription_without_tts_is_not_cacheable(endpoint):
+    result = {"transcript": "Hello", "ai_response": "Hi there."}
+    assert not endpoint.is_cacheable_transcription(result)
+    failed_tts = dict(result, tts_status="elevenlabs_failed")
+    assert not endpoint.is_cacheable_transcription(failed_tts)
+
+
+def test_fallback_answer_is_not_cacheable(endpoint):
+    transcript = "Is this payment clause fair?"
+    result = {
+        "transcript": transcript,
+        "ai_response": endpoint.get_fallback_voice_response(transcript),
+        "audio_data": "SUQz",
+    }
+    assert not endpoint.is_cacheable_transcription(result)
+
+
+def test_transcription_leader_failure_reaches_waiters(ct, endpoint):
+    audio = b"leader-fails"
+    cache_key = ct._transcript_cache_key(audio)
+    error = RuntimeError("upstream down")
+    seen = {}
+
+    def failing_transcribe(audio_data, key):
+        seen["future"] = ct._TRANSCRIBE_INFLIGHT[key]
+        raise error
+
+    endpoint.transcribe_with_fallbacks = failing_transcribe
+    with pytest.raises(RuntimeError):
+        endpoint.transcribe_audio(audio)
+
+    assert seen["future"].exception() is error
+    assert cache_key not in ct._TRANSCRIBE_INFLIGHT
+
+
+def test_transcription_waiter_retries_after_leader_failure(ct, endpoint):
+    audio = b"waiter-retries"
+    cache_key = ct._transcript_cache_key(audio)
+    failed = ct.Future()
+    failed.set_exception(RuntimeError("upstream down"))
+    ct._TRANSCRIBE_INFLIGHT[cache_key] = failed
+    calls = []
+
+    def transcribe(audio_data, key):
+        calls.append(key)
+        return {"transcript": "retried", "status": "success"}
+
+    endpoint.transcribe_with_fallbacks = transcribe
+    assert endpoint.transcribe_audio(audio)["transcript"] == "retried"
+    assert calls == [cache_key]
+
+
+def read_audio_part(endpoint, content_type, body):
+    endpoint.rfile = io.BytesIO(body)
+    audio = endpoint.read_multipart_audio(content_type, len(body))
+    return None if audio is None else bytes(audio)
+
+
+def test_multipart_boundary_text_inside_audio(endpoint):
+    audio = b"\x1aE\xdf\xa3--XyZ not a delimiter--XyZ--\r\n"
+    body = (
+        b"--XyZ\r\nContent-Disposition: form-data; name=\"audio\"; filename=\"rec.webm\"\r\n\r\n"
+        + audio + b"\r\n--XyZ--\r\n"
+    )
+    assert read_audio_part(endpoint, "multipart/form-data; boundary=XyZ", body) == audio
+
+
+def test_multipart_without_final_crlf(endpoint):
+    body = (
+        b"--XyZ\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nhi\r\n"
+        b"--XyZ\r\nContent-Disposition: form-data; name=\"audio\"\r\n\r\nclip\r\n--XyZ--"
+    )
+    assert read_audio_part(endpoint, "multipart/form-data; boundary=XyZ", body) == b"clip"
+
+
+def test_multipart_quoted_boundary(endpoint):
+    body = (
+        b"--a b:c\r\nContent-Disposition: form-data; name=audio\r\n\r\nclip\r\n--a b:c--\r\n"
+    )
+    content_type = 'multipart/form-data; boundary="a b:c"; charset=utf-8'
+    assert read_audio_part(endpoint, content_type, body) == b"clip"
+
+
+def test_multipart_without_audio_part(endpoint):
+    body = b"--XyZ\r\nContent-Disposition: form-data; name=\"audio_note\"\r\n\r\nhi\r\n--XyZ--\r\n"
+    assert read_audio_part(endpoint, "multipart/form-data; boundary=XyZ", body) is None
+
+
+def test_voice_response_leader_failure_reaches_waiters(ct, endpoint, monkeypatch):
+    transcript = "Can they end the lease early?"
+    cache_key = ct._voice_response_cache_key(transcript)
+    error = RuntimeError("quota exceeded")
+    seen = {}
+
+    class FailingModel:
+        def generate_content(self, prompt, **kwargs):
+            seen["future"] = ct._VOICE_RESPONSE_INFLIGHT[cache_key]
+            raise error
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(ct, "_gemini_model", lambda api_key: FailingModel())
+    response = endpoint.generate_voice_response(transcript)
+
+    assert response == endpoint.get_fallback_voice_response(transcript)
+    assert seen["future"].exception() is error
+    assert cache_key not in ct._VOICE_RESPONSE_INFLIGHT
+
+
+def test_voice_response_waiter_falls_back_after_leader_failure(ct, endpoint, monkeypatch):
+    transcript = "Is the deposit refundable?"
+    failed = ct.Future()
+    failed.set_exception(RuntimeError("quota exceeded"))
+    ct._VOICE_RESPONSE_INFLIGHT[ct._voice_response_cache_key(transcript)] = failed
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(ct, "_gemini_model", pytest.fail)
+    assert endpoint.generate_voice_response(transcript) == endpoint.get_fallback_voice_response(transcript)